@@ -0,0 +1,90 @@
+"""
+Backup timings on a large database: the old shutil.copy of the live file on
+the event loop against BackupManager's paged online backup in a thread,
+with each compression mode, plus restore verification and an incremental
+run with no changes.
+
+Loop lag is the longest a 10 ms probe task was kept waiting while the
+backup ran.
+
+Usage: python Benchmarks/backup.py [size_mb]
+"""
+import asyncio
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+
+from Functions.Sql_handler import SQLiteHandler  # noqa: E402
+from Functions.backup import BackupManager  # noqa: E402
+
+
+def seed(path, size_mb):
+    handler = SQLiteHandler(conn=sqlite3.connect(path))
+    conn = handler.conn
+    rows = size_mb * 1024 * 1024 // 600
+    batch = 50000
+    for first in range(0, rows, batch):
+        conn.executemany(
+            "INSERT INTO subscriptions (discord_id, streamer) VALUES (?, ?)",
+            [(str(user), f"streamer{user % 20000}_{os.urandom(4).hex()}" * 12)
+             for user in range(first, min(first + batch, rows))])
+    conn.commit()
+    conn.close()
+
+
+async def probe(lags, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - started - 0.01)
+
+
+async def measure(work, in_thread):
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    result = await asyncio.to_thread(work) if in_thread else work()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    return elapsed, max(lags), result
+
+
+async def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "data.db")
+        seed(path, size_mb)
+        print(f"database: {os.path.getsize(path) / (1024 * 1024):.0f} MB")
+
+        copy_path = os.path.join(folder, "copy.db")
+        elapsed, lag, _ = await measure(lambda: shutil.copy(path, copy_path), in_thread=False)
+        print(f"{'shutil.copy on loop':>24}: {elapsed:6.2f} s, loop lag {lag * 1000:8.1f} ms")
+        os.remove(copy_path)
+
+        for compression in ("none", "gzip", "lzma"):
+            manager = BackupManager(path, os.path.join(folder, compression),
+                                    compression=compression)
+            elapsed, lag, result = await measure(manager.create_backup, in_thread=True)
+            verify_started = time.perf_counter()
+            ok, message = manager.verify_backup(result["path"])
+            verify_time = time.perf_counter() - verify_started
+            print(f"{'backup API + ' + compression:>24}: {elapsed:6.2f} s, loop lag {lag * 1000:8.1f} ms, "
+                  f"{result['size'] / (1024 * 1024):6.0f} MB, verify {verify_time:5.2f} s ({message})")
+
+            if compression == "none":
+                elapsed, _, result = await measure(manager.create_backup, in_thread=True)
+                print(f"{'incremental, unchanged':>24}: {elapsed * 1000:6.2f} ms, skipped: {result is None}")
+            manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""
+Cost of a JsonConfigHandler getter: the old handler, which re-opened and
+re-parsed UI/config.json on every call, against the cached one, which
+serves from memory and only stats the file every check_interval seconds.
+Also checks that a save from a second handler is picked up.
+
+Usage: python Benchmarks/config_getters.py [calls]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Functions.Json_config_hanldler import JsonConfigHandler  # noqa: E402
+
+
+class LegacyConfigHandler:
+    def __init__(self, config_file):
+        self.config_file = config_file
+
+    def load_config(self):
+        with open(self.config_file, "r") as file:
+            return json.load(file)
+
+    def get_max_lines(self):
+        self.config = self.load_config()
+        return self.config["config"].get("max_lines", 1000)
+
+
+def timed(getter, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        getter()
+    return (time.perf_counter() - started) / calls
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "config.json")
+        with open(path, "w") as config_file:
+            json.dump({"config": {
+                "version": "v2.6", "debug": False, "autoupdates": True, "max_lines": 1000,
+                "default_prefix": "!", "log_rotation": {"log.txt": {"max_lines": 1000, "backups": 5}},
+            }}, config_file, indent=4)
+
+        legacy = timed(LegacyConfigHandler(path).get_max_lines, calls)
+        cached_handler = JsonConfigHandler(path)
+        cached = timed(cached_handler.get_max_lines, calls)
+        stat_every_call = JsonConfigHandler(path, check_interval=0)
+        stat_only = timed(stat_every_call.get_max_lines, calls)
+
+        changes = []
+        stat_every_call.on_change(changes.append)
+        JsonConfigHandler(path).set_max_lines(2000)
+        assert stat_every_call.get_max_lines() == 2000
+        assert changes == [{"max_lines": 2000}]
+
+    print(f"{calls} get_max_lines calls")
+    print(f"re-parse every call : {legacy * 1e6:8.2f} us")
+    print(f"stat every call     : {stat_only * 1e6:8.2f} us ({stat_every_call.loads} parses)")
+    print(f"cached (0.5 s check): {cached * 1e6:8.2f} us ({cached_handler.loads} parses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Startup cost of the database layer: one SQLiteHandler per module, as main.py,
+the updater and nine cogs used to create at import, against the single
+shared AsyncSQLiteHandler.
+
+Usage: python Benchmarks/db_startup.py [users]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+
+from Functions.Sql_handler import SQLiteHandler  # noqa: E402
+from Functions.async_db import AsyncSQLiteHandler  # noqa: E402
+
+LEGACY_HANDLERS = 11
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "bench.db")
+        handler = SQLiteHandler(conn=sqlite3.connect(path))
+        handler.conn.executemany(
+            "INSERT INTO subscriptions (discord_id, streamer) VALUES (?, ?)",
+            [(str(user), f"streamer{user % 5000}") for user in range(users)])
+        handler.conn.commit()
+        handler.conn.close()
+
+        start = time.perf_counter()
+        handlers = [SQLiteHandler(db_file=path) for _ in range(LEGACY_HANDLERS)]
+        legacy_time = time.perf_counter() - start
+        for handler in handlers:
+            handler.conn.close()
+
+        start = time.perf_counter()
+        db = AsyncSQLiteHandler(path)
+        shared_time = time.perf_counter() - start
+        connections = db.get_stats()["connections"]
+        db.close()
+
+    print(f"{LEGACY_HANDLERS} handlers: {legacy_time * 1000:8.2f} ms, {LEGACY_HANDLERS} connections")
+    print(f"shared:      {shared_time * 1000:8.2f} ms, {connections} connection(s) before the first read")
+
+
+if __name__ == "__main__":
+    main()
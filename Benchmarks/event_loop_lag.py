@@ -0,0 +1,96 @@
+"""
+Event-loop lag under a synthetic write load: calling SQLiteHandler directly
+on the loop thread against awaiting the AsyncSQLiteHandler facade.
+
+A probe task sleeps for 5 ms at a time and records how late it wakes up,
+while a load task adds and removes watchlist entries and reads the
+distinct streamer list, as the commands and the poller do.
+
+Usage: python Benchmarks/event_loop_lag.py [operations] [users]
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+
+from Functions.Sql_handler import SQLiteHandler  # noqa: E402
+from Functions.async_db import AsyncSQLiteHandler  # noqa: E402
+
+PROBE_INTERVAL = 0.005
+
+
+async def probe(lags, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+def seed(path, users):
+    handler = SQLiteHandler(conn=sqlite3.connect(path))
+    handler.conn.executemany(
+        "INSERT INTO subscriptions (discord_id, streamer) VALUES (?, ?)",
+        [(str(user), f"streamer{(user * 7 + i) % 5000}") for user in range(users) for i in range(20)])
+    handler.conn.commit()
+    handler.conn.close()
+
+
+async def sync_load(handler, operations):
+    for i in range(operations):
+        handler.add_streamer_to_user(str(i), "loadstreamer")
+        handler.remove_streamer_from_user(str(i), "loadstreamer")
+        if i % 10 == 0:
+            handler.get_all_streamers()
+        await asyncio.sleep(0)
+
+
+async def async_load(db, operations):
+    for i in range(operations):
+        await db.add_streamer_to_user(str(i), "loadstreamer")
+        await db.remove_streamer_from_user(str(i), "loadstreamer")
+        if i % 10 == 0:
+            await db.get_all_streamers()
+
+
+async def measure(load):
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    started = time.perf_counter()
+    await load
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    lags.sort()
+    return elapsed, lags
+
+
+def report(name, elapsed, lags):
+    p99 = lags[max(int(len(lags) * 0.99) - 1, 0)] if lags else 0.0
+    print(f"{name:>22}: load {elapsed:6.2f} s, loop lag p99 {p99 * 1000:7.2f} ms, "
+          f"max {(lags[-1] if lags else 0.0) * 1000:7.2f} ms, {len(lags)} probes")
+
+
+async def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "bench.db")
+        seed(path, users)
+        handler = SQLiteHandler(conn=sqlite3.connect(path))
+        report("sync on the loop", *await measure(sync_load(handler, operations)))
+        handler.conn.close()
+
+        db = AsyncSQLiteHandler(path)
+        report("AsyncSQLiteHandler", *await measure(async_load(db, operations)))
+        db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
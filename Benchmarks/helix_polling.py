@@ -0,0 +1,127 @@
+"""
+Compares the old one-request-per-streamer polling against batched polling
+against a local fake Helix /streams server.
+
+Usage: python Benchmarks/helix_polling.py [streamer counts...]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+
+from main import TwitchDiscordBot  # noqa: E402
+from Functions.rate_limiter import HelixRateLimiter  # noqa: E402
+from Functions.poll_scheduler import PollScheduler  # noqa: E402
+from Functions.stream_sessions import StreamSessionRecorder  # noqa: E402
+
+LIVE_RATIO = 0.05
+
+
+class FakeHelix:
+    def __init__(self, live_logins):
+        self.live_logins = live_logins
+        self.requests = 0
+
+    async def streams(self, request):
+        self.requests += 1
+        logins = request.query.getall("user_login", [])
+        first = int(request.query.get("first", 20))
+        data = [
+            {
+                "user_login": login,
+                "user_id": str(abs(hash(login))),
+                "started_at": "2023-12-08T00:00:00Z",
+                "viewer_count": 10,
+                "title": "bench",
+                "game_name": "bench",
+            }
+            for login in logins
+            if login in self.live_logins
+        ][:first]
+        return web.json_response({"data": data, "pagination": {}})
+
+
+def make_bot(api_url, session):
+    bot = TwitchDiscordBot.__new__(TwitchDiscordBot)
+    bot.helix = HelixRateLimiter(session)
+    bot.poll_scheduler = PollScheduler()
+    # observe() only records in memory; nothing is flushed in the benchmark
+    bot.sessions = StreamSessionRecorder(None)
+    bot.API_BASE_URL = api_url
+    bot.HEADERS = {}
+    bot.HELIX_BATCH_SIZE = 100
+    bot.processed_streamers = []
+    bot.others = sys.modules["Functions.others"]
+
+    async def send_notification(streamer_name, data):
+        return None
+
+    bot.send_notification = send_notification
+    return bot
+
+
+async def legacy_check(bot, session, streamer_name):
+    async with session.get(
+        bot.API_BASE_URL, headers=bot.HEADERS, params={"user_login": streamer_name}
+    ) as response:
+        data = await response.json()
+        bot.update_stream_status(
+            streamer_name, data["data"][0] if data["data"] else None)
+
+
+async def run(count):
+    streamers = [f"streamer{i}" for i in range(count)]
+    live = set(random.sample(streamers, int(count * LIVE_RATIO)))
+    helix = FakeHelix(live)
+    app = web.Application()
+    app.router.add_get("/helix/streams", helix.streams)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    results = {}
+    connector = aiohttp.TCPConnector(limit=100)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        bot = make_bot(f"http://127.0.0.1:{port}/helix/streams", session)
+        helix.requests = 0
+        start = time.perf_counter()
+        await asyncio.gather(*[legacy_check(bot, session, s) for s in streamers])
+        results["legacy"] = (helix.requests, time.perf_counter() - start)
+        assert len(bot.processed_streamers) == len(live)
+
+        bot.processed_streamers = []
+        helix.requests = 0
+        start = time.perf_counter()
+        await asyncio.gather(
+            *[
+                bot.check_streams(batch)
+                for batch in bot.others.chunk_list(streamers, bot.HELIX_BATCH_SIZE)
+            ]
+        )
+        results["batched"] = (helix.requests, time.perf_counter() - start)
+        assert len(bot.processed_streamers) == len(live)
+
+    await runner.cleanup()
+    return results
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    print(f"{'streamers':>10} {'mode':>8} {'requests':>10} {'cycle time':>12}")
+    for count in counts:
+        results = asyncio.run(run(count))
+        for mode, (requests, elapsed) in results.items():
+            print(f"{count:>10} {mode:>8} {requests:>10} {elapsed:>11.3f}s")
+
+
+if __name__ == "__main__":
+    main()
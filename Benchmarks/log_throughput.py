@@ -0,0 +1,133 @@
+"""
+log_print throughput on the event loop while a simulated poller and DM
+fan-out are running: the old synchronous log_print (unpickle, config read,
+stdout swap, append and a trim thread per line) against the queued
+LogWriter.
+
+Usage: python Benchmarks/log_throughput.py [lines]
+"""
+import asyncio
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+os.makedirs("UI\\config.json".rsplit("\\", 1)[0], exist_ok=True)
+with open("UI\\config.json", "w") as config_file:
+    config_file.write('{"config": {"max_lines": 1000}}')
+
+import Functions.others  # noqa: E402
+from Functions.bot_state import BotState  # noqa: E402
+from Functions.log_writer import LogWriter, RotationPolicy  # noqa: E402
+
+MESSAGE = (
+    "\x1b[36m[2026-01-01 \x1b[94m12:00:00\x1b[0m]\x1b[0m\x1b[32m [SUCCESS] \x1b[0m"
+    "Notification for \x1b[36mstreamer\x1b[0m sent to user \x1b[36m123456789\x1b[0m")
+
+
+def legacy_log_print(message, log_file_name="log.txt", show_message=True):
+    cwd = os.getcwd()
+
+    console_width = Functions.others.unpickle_variable()["console_width"]
+    max_lines = Functions.others.chj.get_max_lines()
+    logs_folder = os.path.join(cwd, "Logs")
+    log_file_name = os.path.join(logs_folder, log_file_name)
+
+    if not os.path.exists(logs_folder):
+        os.makedirs("Logs")
+
+    def remove_color_codes(text):
+        color_pattern = re.compile(r"(\x1b\[[0-9;]*m)|(\033\[K)")
+        return color_pattern.sub("", text)
+
+    def trim_log_file():
+        try:
+            with open(log_file_name, "r", encoding="utf-8") as original_file:
+                lines = original_file.readlines()
+
+            if len(lines) >= max_lines:
+                lines_to_remove = len(lines) - max_lines + 1
+                new_lines = lines[lines_to_remove:]
+                with open(log_file_name, "w", encoding="utf-8") as updated_file:
+                    updated_file.writelines(new_lines)
+
+        except Exception:
+            pass
+
+    original_stdout = sys.stdout
+
+    if show_message:
+        print(" " * console_width, end="\r")
+        print(message)
+    try:
+        with open(log_file_name, "a", encoding="utf-8") as log_file:
+            sys.stdout = log_file
+            message_without_colors = remove_color_codes(message)
+            print(message_without_colors)
+        threading.Thread(target=trim_log_file, daemon=True).start()
+    finally:
+        sys.stdout = original_stdout
+
+
+async def run_load(log, lines):
+    """Poller plus fan-out tasks sharing `lines` log calls; returns (seconds, lag p99)."""
+    lags = []
+    done = asyncio.Event()
+
+    async def monitor():
+        while not done.is_set():
+            expected = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - expected)
+
+    async def poller():
+        for _ in range(lines // 10):
+            sum(range(2000))  # stand-in for parsing a Helix batch
+            log(MESSAGE, show_message=False)
+            await asyncio.sleep(0)
+
+    async def fan_out(worker_lines):
+        for _ in range(worker_lines):
+            log(MESSAGE, show_message=False)
+            await asyncio.sleep(0)
+
+    monitor_task = asyncio.create_task(monitor())
+    started = time.perf_counter()
+    workers = 8
+    await asyncio.gather(
+        poller(), *[fan_out((lines - lines // 10) // workers) for _ in range(workers)])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await monitor_task
+    lags.sort()
+    return elapsed, lags[max(int(len(lags) * 0.99) - 1, 0)] if lags else 0.0
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    Functions.others.pickle_variable({"console_width": 120, "version": "bench"})
+
+    legacy_time, legacy_lag = asyncio.run(run_load(legacy_log_print, lines))
+    shutil.rmtree("Logs", ignore_errors=True)
+
+    Functions.others.shared_state = BotState("bench", 120, "", [], [], [])
+    Functions.others.log_writer = LogWriter({"*": RotationPolicy(max_lines=1000)})
+    queued_time, queued_lag = asyncio.run(run_load(Functions.others.log_print, lines))
+    started = time.perf_counter()
+    Functions.others.flush_logs()
+    drain_time = time.perf_counter() - started
+    stats = Functions.others.log_writer.get_stats()
+
+    print(f"{lines} lines with poller + 8 fan-out tasks")
+    print(f"legacy  : {lines / legacy_time:10.0f} lines/s, loop lag p99 {legacy_lag * 1000:7.2f} ms")
+    print(f"queued  : {lines / queued_time:10.0f} lines/s, loop lag p99 {queued_lag * 1000:7.2f} ms "
+          f"(+{drain_time * 1000:.1f} ms to drain, {stats['batches']} batches, {stats['rotations']} rotations)")
+
+
+if __name__ == "__main__":
+    main()
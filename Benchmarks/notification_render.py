@@ -0,0 +1,82 @@
+"""
+Per-recipient CPU cost of a live notification: building the embed inside the
+per-user loop (old send_notification) against rendering it once and only
+serialising it per send.
+
+Usage: python Benchmarks/notification_render.py [recipients]
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+
+import Functions.others  # noqa: E402
+from Functions.notifications import render_live_notification  # noqa: E402
+
+STREAM_DATA = {
+    "id": "40000000000",
+    "user_id": "12345",
+    "game_name": "Just Chatting",
+    "title": "benchmark stream",
+    "viewer_count": 2000,
+    "started_at": "2023-12-08T00:00:00Z",
+}
+PFP = "https://static-cdn.jtvnw.net/jtv_user_pictures/x-profile_image-300x300.png"
+
+
+class FakeMember:
+    def __init__(self, user_id):
+        self.mention = f"<@{user_id}>"
+
+
+def legacy(members):
+    for member in members:
+        start_time_str = Functions.others.generate_timestamp_string(
+            STREAM_DATA["started_at"])
+        viewers = STREAM_DATA.get("viewer_count", 0)
+        embed = discord.Embed(
+            title="bench is streaming!",
+            description="Click [here](https://www.twitch.tv/bench) to watch the stream.",
+            color=discord.Color.green(),
+            timestamp=datetime.datetime.now(),
+        )
+        embed.add_field(name="Game", value=STREAM_DATA["game_name"])
+        embed.add_field(
+            name="Viewers", value="No viewers. Be the first!" if viewers == 0 else viewers)
+        embed.add_field(name="Title", value=STREAM_DATA["title"])
+        embed.set_thumbnail(url=PFP)
+        embed.set_footer(text="v3.0 | Made by Beelzebub2")
+        mention = f"||{member.mention}||"
+        embed.add_field(name="Stream Start Time (local)", value=start_time_str)
+        embed.to_dict()  # what discord.py does when sending
+        mention
+
+
+def rendered(members):
+    notification = render_live_notification("bench", STREAM_DATA, PFP, "v3.0")
+    for member in members:
+        notification.mention_for(member)
+        notification.embed.to_dict()
+
+
+def main():
+    recipients = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    members = [FakeMember(i) for i in range(recipients)]
+    results = {}
+    for name, func in (("per-recipient build", legacy), ("render once", rendered)):
+        start = time.process_time()
+        func(members)
+        results[name] = time.process_time() - start
+    for name, elapsed in results.items():
+        print(f"{name:>20}: {elapsed * 1000:8.1f} ms total, "
+              f"{elapsed / recipients * 1e6:6.2f} us CPU per recipient")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Outbox insert and drain rates: one commit per row for everything against
+the way the bot uses SQLiteHandler's outbox methods. Enqueueing, claiming
+(and retrying) are batched; completion is deliberately one commit per row,
+as in main.py's deliver_outbox_row, so a restart never re-sends a DM that
+was already delivered. Both use the bot's WAL connection settings.
+
+Usage: python Benchmarks/outbox.py [rows]
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+
+from Functions.Sql_handler import SQLiteHandler  # noqa: E402
+from Functions.async_db import PRAGMAS  # noqa: E402
+
+PAYLOAD = json.dumps({"title": "bench is streaming!", "fields": [{"name": "Viewers", "value": "10"}]})
+
+
+def make_handler(path):
+    conn = sqlite3.connect(path)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    conn.execute("PRAGMA journal_mode = WAL")
+    return SQLiteHandler(conn=conn)
+
+
+def per_row(handler, rows):
+    start = time.perf_counter()
+    handler.conn.execute(
+        "INSERT INTO outbox_payloads (stream_id, streamer, payload, created_at) VALUES ('s1', 'bench', ?, 0)",
+        (PAYLOAD,))
+    handler.conn.commit()
+    for recipient in range(rows):
+        handler.conn.execute(
+            "INSERT INTO outbox (stream_id, recipient, updated_at) VALUES ('s1', ?, 0)",
+            (str(recipient),))
+        handler.conn.commit()
+    insert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ids = [row[0] for row in handler.conn.execute("SELECT id FROM outbox")]
+    for row_id in ids:
+        handler.conn.execute("UPDATE outbox SET status = 'sent' WHERE id = ?", (row_id,))
+        handler.conn.commit()
+    return insert_time, time.perf_counter() - start
+
+
+def as_bot(handler, rows):
+    start = time.perf_counter()
+    handler.enqueue_outbox("s1", "bench", PAYLOAD, range(rows))
+    insert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while True:
+        claimed = handler.claim_outbox_batch(500)
+        if not claimed:
+            break
+        for row in claimed:
+            handler.complete_outbox([row[0]])
+    return insert_time, time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    for name, func in (("per-row commits", per_row), ("as the bot", as_bot)):
+        with tempfile.TemporaryDirectory() as folder:
+            handler = make_handler(os.path.join(folder, "bench.db"))
+            insert_time, drain_time = func(handler, rows)
+            handler.conn.close()
+        print(f"{name:>16}: insert {rows / insert_time:10.0f} rows/s, "
+              f"drain {rows / drain_time:10.0f} rows/s")
+    print("(drain = batched claim + one complete_outbox commit per delivered row)")
+
+
+if __name__ == "__main__":
+    main()
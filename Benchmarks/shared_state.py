@@ -0,0 +1,89 @@
+"""
+Per-command cost of reading shared values: unpickling variables.pkl, as
+the cogs and log_print did on every call, against reading BotState in
+memory. The old pickle also carried the streamer metadata cache, so it
+grows with the number of watched streamers.
+
+Usage: python Benchmarks/shared_state.py [streamers] [iterations]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Functions.others  # noqa: E402
+from Functions.bot_state import BotState  # noqa: E402
+
+
+def legacy_variables(streamers):
+    return {
+        "console_width": 120,
+        "processed_streamers": [f"streamer{i}" for i in range(0, streamers, 50)],
+        "version": "v3.0",
+        "authorization": "x" * 30,
+        "client_id": "y" * 30,
+        "date_format": "%Y-%m-%d %H:%M:%S.%f",
+        "loaded_commands": [f"command {i} Loaded" for i in range(13)],
+        "failed_commands": [],
+        "headers": {"Client-ID": "y" * 30, "Authorization": "Bearer " + "x" * 30},
+        "streamers_cache": {
+            f"streamer{i}": {
+                "id": str(100000 + i),
+                "login": f"streamer{i}",
+                "display_name": f"Streamer{i}",
+                "type": "",
+                "broadcaster_type": "affiliate",
+                "description": "Just a streamer " * 8,
+                "profile_image_url": f"https://static-cdn.jtvnw.net/{i}-profile_image-300x300.png",
+                "offline_image_url": "",
+                "view_count": 0,
+                "created_at": "2020-01-01T00:00:00Z",
+            }
+            for i in range(streamers)
+        },
+    }
+
+
+def measure(function, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    streamers = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    folder = f"TwitchDiscordNotificationsBench{os.getpid()}"
+    variables = legacy_variables(streamers)
+    Functions.others.pickle_variable(variables, folder=folder)
+    state = BotState(
+        version=variables["version"],
+        console_width=variables["console_width"],
+        date_format=variables["date_format"],
+        processed_streamers=variables["processed_streamers"],
+        loaded_commands=variables["loaded_commands"],
+        failed_commands=variables["failed_commands"],
+    )
+    try:
+        legacy = measure(
+            lambda: Functions.others.unpickle_variable(folder=folder)["version"], iterations)
+        shared = measure(lambda: state.version, iterations)
+    finally:
+        path = os.path.join(tempfile.gettempdir(), folder)
+        os.remove(os.path.join(path, "variables.pkl"))
+        os.rmdir(path)
+
+    print(f"{streamers} cached streamers, {iterations} reads")
+    for label, (mean, p99) in (("unpickle", legacy), ("BotState", shared)):
+        print(f"{label:9}: {mean * 1e6:10.2f} us avg, {p99 * 1e6:10.2f} us p99")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Helix requests needed to fill the streamer metadata cache on a cold start
+and again after a restart: the old in-memory dict (one users?login= request
+per streamer, lost on restart) against the SQLite-backed
+StreamerMetadataCache (100 logins per request, kept across restarts).
+
+Usage: python Benchmarks/streamer_cache.py [streamers]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+
+from Functions.async_db import AsyncSQLiteHandler  # noqa: E402
+from Functions.streamer_cache import StreamerMetadataCache  # noqa: E402
+
+
+class FakeHelix:
+    """Answers users lookups instantly and counts the requests."""
+
+    def __init__(self):
+        self.requests = 0
+
+    async def get(self, url, priority=None, headers=None, params=None):
+        self.requests += 1
+        logins = [value for key, value in params] if params else [url.rsplit("=", 1)[1]]
+        return 200, {"data": [
+            {"id": str(abs(hash(login))), "login": login, "display_name": login.title(),
+             "profile_image_url": f"https://example.com/{login}-{{width}}x{{height}}.png"}
+            for login in logins
+        ]}
+
+
+async def legacy_start(helix, streamers):
+    cache = {}
+
+    async def fetch(streamer_name):
+        if streamer_name in cache:
+            return
+        status, data = await helix.get(f"https://api.twitch.tv/helix/users?login={streamer_name}")
+        if status == 200 and data and data["data"]:
+            cache[streamer_name] = data["data"][0]
+
+    await asyncio.gather(*[fetch(streamer) for streamer in streamers])
+    return cache
+
+
+async def cached_start(path, helix, streamers):
+    db = AsyncSQLiteHandler(path)
+    try:
+        cache = StreamerMetadataCache(db, helix, {})
+        await cache.refresh_expired(limit=len(streamers))
+        found = await cache.get_many(streamers)
+    finally:
+        db.close()
+    return found
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    streamers = [f"streamer{i}" for i in range(count)]
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "bench.db")
+        db = AsyncSQLiteHandler(path)
+        with db.writer.conn:
+            db.writer.conn.executemany(
+                "INSERT INTO subscriptions (discord_id, streamer) VALUES (?, ?)",
+                [(str(i), streamer) for i, streamer in enumerate(streamers)])
+        db.close()
+
+        for label, start in (
+            ("dict", lambda helix: legacy_start(helix, streamers)),
+            ("sqlite", lambda helix: cached_start(path, helix, streamers)),
+        ):
+            for run in ("cold start", "restart"):
+                helix = FakeHelix()
+                started = time.perf_counter()
+                found = asyncio.run(start(helix))
+                elapsed = time.perf_counter() - started
+                print(f"{label:6} {run:10}: {helix.requests:6} Helix requests, "
+                      f"{len(found)} streamers, {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Reading the structured event log: tail and time-range queries through the
+sidecar offset index against scanning the whole file, which is what
+answering the same question from the free-text logs takes.
+
+Usage: python Benchmarks/structured_log.py [records]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Functions.structured_log import JsonLinesSink, StructuredLogReader  # noqa: E402
+
+
+def full_scan(path, start, **filters):
+    results = []
+    with open(path, "rb") as log_file:
+        for line in log_file:
+            record = json.loads(line)
+            if record["ts"] >= start and all(record.get(k) == v for k, v in filters.items()):
+                results.append(record)
+    return results
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "events.jsonl")
+        sink = JsonLinesSink(path, max_bytes=1 << 40)
+        now = time.time()
+        batch = []
+        for i in range(count):
+            batch.append({
+                "ts": now - (count - i), "level": "info",
+                "event": "notification_failed" if i % 50 == 0 else "notification_sent",
+                "streamer": f"streamer{i % 500}", "user": str(10 ** 17 + i % 20000),
+                "latency_ms": 120.5,
+            })
+            if len(batch) == 5000:
+                sink.write_records(batch)
+                batch = []
+        sink.write_records(batch)
+        sink.close()
+        size = os.path.getsize(path)
+
+        reader = StructuredLogReader(path)
+        hour_ago = now - 3600
+        filters = {"event": "notification_failed", "streamer": "streamer0"}
+        results = [
+            ("tail 15", timed(reader.tail, 15), timed(lambda: full_scan(path, 0)[-15:])),
+            ("last hour", timed(reader.range, hour_ago), timed(full_scan, path, hour_ago)),
+            ("failures for one streamer, last hour",
+             timed(reader.range, hour_ago, **filters), timed(full_scan, path, hour_ago, **filters)),
+        ]
+
+    print(f"{count} records, {size / 1024 / 1024:.1f} MB")
+    for label, (indexed_time, indexed), (scan_time, scanned) in results:
+        assert indexed == scanned
+        print(f"{label:38}: index {indexed_time * 1000:8.2f} ms, full scan {scan_time * 1000:8.1f} ms "
+              f"({len(indexed)} records)")
+
+
+if __name__ == "__main__":
+    main()
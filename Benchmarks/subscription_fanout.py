@@ -0,0 +1,73 @@
+"""
+Fan-out cost of one live event: walking every (user, watchlist) pair, as
+send_notification used to, against a SubscriptionIndex lookup.
+
+Usage: python Benchmarks/subscription_fanout.py [users] [streamers_per_user]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Functions.subscription_index import SubscriptionIndex  # noqa: E402
+
+STREAMER_POOL = 20000
+
+
+def legacy_fanout(ids_with_streamers, streamer_name):
+    recipients = []
+    for user_id, streamers in ids_with_streamers:
+        for streamer in streamers:
+            if streamer_name == streamer.strip():
+                recipients.append(user_id)
+    return recipients
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    pool = [f"streamer{i}" for i in range(STREAMER_POOL)]
+    random.seed(1)
+    watchlists = {
+        str(user_id): random.sample(pool, per_user) for user_id in range(users)
+    }
+    target = "streamer0"
+    print(f"{users} users x {per_user} streamers ({users * per_user} subscriptions)")
+
+    start = time.perf_counter()
+    legacy = legacy_fanout(watchlists.items(), target)
+    legacy_time = time.perf_counter() - start
+    print(f"legacy scan:  {legacy_time * 1000:10.2f} ms per event "
+          f"({len(legacy)} recipients)")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = SubscriptionIndex()
+    index.build(watchlists)
+    build_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"index build:  {build_time * 1000:10.2f} ms once, "
+          f"{peak / (1024 * 1024):.1f} MB peak")
+
+    runs = 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        recipients = index.get_subscribers(target)
+    index_time = (time.perf_counter() - start) / runs
+    assert sorted(recipients) == sorted(legacy)
+    print(f"index lookup: {index_time * 1000:10.4f} ms per event "
+          f"({len(recipients)} recipients, {legacy_time / index_time:.0f}x faster)")
+
+    start = time.perf_counter()
+    for user_id in range(1000):
+        index.add(str(user_id), "newstreamer")
+        index.remove(str(user_id), "newstreamer")
+    print(f"watch+unwatch: {(time.perf_counter() - start) / 1000 * 1e6:9.2f} us per update")
+
+
+if __name__ == "__main__":
+    main()
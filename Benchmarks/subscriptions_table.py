@@ -0,0 +1,124 @@
+"""
+Watchlist queries at scale: the old comma-joined `users.streamer` column
+against the normalized `subscriptions` table, plus the time the online
+migration takes to convert one layout into the other.
+
+Usage: python Benchmarks/subscriptions_table.py [users] [streamers_per_user]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+
+from Functions.Sql_handler import SQLiteHandler  # noqa: E402
+from Functions.migrations import MigrationRunner  # noqa: E402
+
+STREAMER_POOL = 20000
+
+
+def legacy_all_streamers(conn):
+    unique_streamers = set()
+    for row in conn.execute("SELECT DISTINCT streamer FROM legacy_users"):
+        unique_streamers.update(row[0].split(','))
+    return unique_streamers
+
+
+def legacy_subscribers(conn, streamer):
+    return [
+        discord_id
+        for discord_id, streamers in conn.execute("SELECT discord_id, streamer FROM legacy_users")
+        if streamer in streamers.split(',')
+    ]
+
+
+def legacy_add(conn, discord_id, streamer):
+    current = conn.execute(
+        "SELECT streamer FROM legacy_users WHERE discord_id = ?", (discord_id,)).fetchone()[0]
+    streamers = current.split(',')
+    if streamer not in streamers:
+        streamers.append(streamer)
+    conn.execute("UPDATE legacy_users SET streamer = ? WHERE discord_id = ?",
+                 (','.join(streamers), discord_id))
+    conn.commit()
+
+
+def legacy_remove(conn, discord_id, streamer):
+    current = conn.execute(
+        "SELECT streamer FROM legacy_users WHERE discord_id = ?", (discord_id,)).fetchone()[0]
+    streamers = current.split(',')
+    streamers.remove(streamer)
+    conn.execute("UPDATE legacy_users SET streamer = ? WHERE discord_id = ?",
+                 (','.join(streamers), discord_id))
+    conn.commit()
+
+
+def timed(func, *args, runs=1):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = func(*args)
+    return (time.perf_counter() - start) / runs, result
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    pool = [f"streamer{i}" for i in range(STREAMER_POOL)]
+    random.seed(1)
+    rows = [
+        (str(user_id), f"user{user_id}", ','.join(random.sample(pool, per_user)))
+        for user_id in range(users)
+    ]
+    print(f"{users} users x {per_user} streamers ({users * per_user} subscription rows)")
+
+    with tempfile.TemporaryDirectory() as folder:
+        conn = sqlite3.connect(os.path.join(folder, "bench.db"))
+        handler = SQLiteHandler(conn=conn)
+        conn.execute("CREATE TABLE legacy_users (discord_id TEXT UNIQUE, username TEXT, streamer TEXT)")
+        conn.execute("CREATE INDEX legacy_streamer_index ON legacy_users (streamer)")
+        conn.executemany("INSERT INTO legacy_users VALUES (?, ?, ?)", rows)
+        conn.executemany("INSERT INTO users (discord_id, username, streamer) VALUES (?, ?, ?)", rows)
+        conn.commit()
+
+        # Rewind past the subscriptions migration so its backfill runs again
+        conn.execute("PRAGMA user_version = 1")
+        runner = MigrationRunner(conn, progress=None)
+        elapsed, _ = timed(runner.run)
+        print(f"{'migration':>22}: {elapsed:9.3f} s for {users} users "
+              f"({handler.count_subscriptions()} rows)")
+
+        target = "streamer0"
+        for name, legacy, (func, args) in (
+            ("all distinct streamers", (legacy_all_streamers, (conn,)),
+             (handler.get_all_streamers, ())),
+            ("subscribers of X", (legacy_subscribers, (conn, target)),
+             (handler.get_subscribers, (target,))),
+        ):
+            legacy_time, legacy_result = timed(legacy[0], *legacy[1])
+            new_time, new_result = timed(func, *args, runs=5)
+            assert sorted(legacy_result) == sorted(new_result)
+            print(f"{name:>22}: {legacy_time * 1000:9.2f} ms legacy, "
+                  f"{new_time * 1000:9.2f} ms normalized ({legacy_time / new_time:.0f}x)")
+
+        runs = 500
+        start = time.perf_counter()
+        for user_id in range(runs):
+            legacy_add(conn, str(user_id), "newstreamer")
+            legacy_remove(conn, str(user_id), "newstreamer")
+        legacy_time = (time.perf_counter() - start) / runs
+        start = time.perf_counter()
+        for user_id in range(runs):
+            handler.add_streamer_to_user(str(user_id), "newstreamer")
+            handler.remove_streamer_from_user(str(user_id), "newstreamer")
+        new_time = (time.perf_counter() - start) / runs
+        print(f"{'watch+unwatch':>22}: {legacy_time * 1000:9.2f} ms legacy, "
+              f"{new_time * 1000:9.2f} ms normalized")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
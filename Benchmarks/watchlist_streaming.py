@@ -0,0 +1,118 @@
+"""
+Time and peak RSS of reading every watchlist: the old thread-pooled split of
+comma-joined `users.streamer` strings into a dict, against streaming
+(discord_id, streamer) pairs off the subscriptions index.
+
+Each variant runs in a fresh subprocess so its peak RSS is its own.
+
+Usage: python Benchmarks/watchlist_streaming.py [streamers_per_user] [user counts...]
+"""
+import concurrent.futures
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+
+from Functions.Sql_handler import SQLiteHandler  # noqa: E402
+
+STREAMER_POOL = 20000
+
+
+def peak_rss():
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset
+
+
+def legacy(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT discord_id, streamer FROM legacy_users")
+    rows = cursor.fetchall()
+
+    user_ids_with_streamers = {}
+
+    def process_row(row):
+        discord_id, streamers_string = row
+        streamers_list = streamers_string.split(',')
+
+        if discord_id not in user_ids_with_streamers:
+            user_ids_with_streamers[discord_id] = streamers_list
+        else:
+            user_ids_with_streamers[discord_id].extend(streamers_list)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        executor.map(process_row, rows)
+
+    return sum(len(streamers) for streamers in user_ids_with_streamers.values())
+
+
+def streaming(conn):
+    handler = SQLiteHandler(conn=conn, create_schema=False)
+    return sum(1 for _ in handler.iter_subscriptions())
+
+
+def grouped(conn):
+    handler = SQLiteHandler(conn=conn, create_schema=False)
+    return sum(len(streamers) for _, streamers in handler.iter_user_watchlists())
+
+
+VARIANTS = {"legacy dict": legacy, "iter_subscriptions": streaming,
+            "iter_user_watchlists": grouped}
+
+
+def child(variant, path):
+    conn = sqlite3.connect(path)
+    baseline = peak_rss()
+    start = time.perf_counter()
+    pairs = VARIANTS[variant](conn)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed} {peak_rss() - baseline} {pairs}")
+
+
+def seed(path, users, per_user):
+    conn = sqlite3.connect(path)
+    SQLiteHandler(conn=conn)
+    conn.execute("CREATE TABLE legacy_users (discord_id TEXT UNIQUE, streamer TEXT)")
+    for first in range(0, users, 100000):
+        batch = [
+            (str(user_id), [f"streamer{(user_id * 31 + i * 977) % STREAMER_POOL}" for i in range(per_user)])
+            for user_id in range(first, min(first + 100000, users))
+        ]
+        conn.executemany("INSERT INTO legacy_users VALUES (?, ?)",
+                         [(user_id, ','.join(streamers)) for user_id, streamers in batch])
+        conn.executemany("INSERT INTO subscriptions (discord_id, streamer) VALUES (?, ?)",
+                         [(user_id, streamer) for user_id, streamers in batch for streamer in streamers])
+    conn.commit()
+    conn.close()
+
+
+def main():
+    per_user = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sizes = [int(size) for size in sys.argv[2:]] or [10000, 100000, 1000000]
+    for users in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "bench.db")
+            seed(path, users, per_user)
+            print(f"{users} users x {per_user} streamers")
+            for variant in VARIANTS:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", variant, path],
+                    capture_output=True, text=True, check=True).stdout.split()
+                elapsed, rss, pairs = float(output[0]), int(output[1]), int(output[2])
+                print(f"  {variant:>20}: {elapsed * 1000:9.1f} ms, "
+                      f"peak RSS +{rss / (1024 * 1024):7.1f} MB ({pairs} pairs)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -1,25 +1,110 @@
+import copy
 import json
+import os
+import tempfile
+import time
 
 
 class JsonConfigHandler:
-    def __init__(self, config_file):
+    """
+    Reads and writes UI/config.json.
+
+    The parsed file is kept in memory and only re-read when its mtime or
+    size (or inode) changes, which is checked at most every `check_interval` seconds,
+    so getters are cheap enough to call per log line. Saves go to a temp
+    file that is renamed over the config, so another process never reads a
+    half-written file. Callbacks registered with `on_change` get a
+    {key: new value} dict whenever a reload or save changes a value.
+    """
+
+    def __init__(self, config_file, check_interval=0.5):
         self.config_file = config_file
+        self.check_interval = check_interval
+        self.signature = None
+        self.last_check = 0.0
+        self.known = {}
+        self.callbacks = []
+        self.loads = 0
+        self.config = None
         self.config = self.load_config()
 
+    def file_signature(self):
+        try:
+            stat = os.stat(self.config_file)
+        except FileNotFoundError:
+            return None
+        # The inode changes on every atomic save, even within one mtime tick
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
     def load_config(self):
+        now = time.monotonic()
+        if self.config is not None and now - self.last_check < self.check_interval:
+            return self.config
+        self.last_check = now
+        signature = self.file_signature()
+        if self.config is not None and signature is not None and signature == self.signature:
+            return self.config
+
         try:
             with open(self.config_file, "r") as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            default_config = {
+                config = json.load(file)
+        except FileNotFoundError:
+            config = {
                 "config": {"version": "v2.6", "debug": False, "autoupdates": True}
             }
-            self.save_config(default_config)
-            return default_config
+            self.save_config(config)
+            return config
+        except json.JSONDecodeError:
+            # Hand-edited or written by an old non-atomic writer; keep what
+            # we had instead of replacing the user's file with defaults
+            if self.config is not None:
+                return self.config
+            return {"config": {"version": "v2.6", "debug": False, "autoupdates": True}}
+
+        self.loads += 1
+        self.signature = signature
+        self.config = config
+        self.notify(config)
+        return config
 
     def save_config(self, config):
-        with open(self.config_file, "w") as file:
-            json.dump(config, file, indent=4)
+        folder = os.path.dirname(os.path.abspath(self.config_file))
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=folder, prefix=".config-", suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(config, file, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.config_file)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.config = config
+        self.signature = self.file_signature()
+        self.last_check = time.monotonic()
+        self.notify(config)
+
+    def on_change(self, callback):
+        """Call `callback({key: new value})` whenever config values change."""
+        self.callbacks.append(callback)
+
+    def notify(self, config):
+        current = config.get("config", {})
+        changed = {
+            key: value for key, value in current.items()
+            if key not in self.known or self.known[key] != value
+        }
+        self.known = copy.deepcopy(current)
+        if changed and self.callbacks:
+            for callback in self.callbacks:
+                callback(changed)
+
+    def reload(self):
+        """Check the file now, ignoring check_interval; returns the config."""
+        self.last_check = 0.0
+        return self.load_config()
 
     def get_version(self):
         self.config = self.load_config()
@@ -76,3 +161,59 @@ class JsonConfigHandler:
     def set_time(self, start_time):
         self.config["config"]["start_time"] = start_time
         self.save_config(self.config)
+
+    def get_poll_budget(self):
+        self.config = self.load_config()
+        return int(self.config["config"].get("poll_budget", 600))
+
+    def get_eventsub(self):
+        self.config = self.load_config()
+        return self.config["config"].get("eventsub", False)
+
+    def get_delivery_workers(self):
+        self.config = self.load_config()
+        return int(self.config["config"].get("delivery_workers", 4))
+
+    def get_backups(self):
+        self.config = self.load_config()
+        return self.config["config"].get("backups", True)
+
+    def get_backup_interval(self):
+        self.config = self.load_config()
+        return int(self.config["config"].get("backup_interval_minutes", 60))
+
+    def get_backup_retention(self):
+        self.config = self.load_config()
+        return int(self.config["config"].get("backup_retention", 12))
+
+    def get_backup_compression(self):
+        self.config = self.load_config()
+        return self.config["config"].get("backup_compression", "gzip")
+
+    def get_backup_incremental(self):
+        self.config = self.load_config()
+        return self.config["config"].get("backup_incremental", True)
+
+    def get_streamer_cache_ttl(self):
+        self.config = self.load_config()
+        return float(self.config["config"].get("streamer_cache_ttl_hours", 24))
+
+    def get_streamer_cache_size(self):
+        self.config = self.load_config()
+        return int(self.config["config"].get("streamer_cache_size", 5000))
+
+    def get_session_retention(self):
+        self.config = self.load_config()
+        return int(self.config["config"].get("session_retention_days", 180))
+
+    def get_state_snapshot_interval(self):
+        self.config = self.load_config()
+        return int(self.config["config"].get("state_snapshot_seconds", 60))
+
+    def get_log_rotation(self):
+        self.config = self.load_config()
+        return self.config["config"].get("log_rotation", {})
+
+    def get_structured_logs(self):
+        self.config = self.load_config()
+        return self.config["config"].get("structured_logs", False)
@@ -1,67 +1,49 @@
+import itertools
 import json
+import operator
 import os
 import sqlite3
 import tempfile
-import concurrent.futures
+import time
 import Utilities.custom_decorators
+from Functions.migrations import MigrationRunner
 
+# Monday 00:00 UTC is hour 0, matching PollScheduler.hour_of_week
+HOUR_OF_WEEK_SQL = (
+    "((CAST(strftime('%w', started_at, 'unixepoch') AS INTEGER) + 6) % 7) * 24"
+    " + CAST(strftime('%H', started_at, 'unixepoch') AS INTEGER)"
+)
 
-class SQLiteHandler:
-    def __init__(self, db_file=None, conn=None):
-        app_data_dir = os.getenv('APPDATA')
-        db_folder = os.path.join(app_data_dir, "TwitchDiscordNotifications")
-        default_db_file = os.path.join(db_folder, "data.db")
 
-        if not os.path.exists(db_folder):
-            os.makedirs(db_folder)
+class SQLiteHandler:
+    def __init__(self, db_file=None, conn=None, create_schema=True):
+        default_db_file = self.get_default_db_file()
 
         if db_file:
             self.db_file = db_file
-            self.conn = sqlite3.connect(default_db_file)
+            self.conn = sqlite3.connect(db_file)
         elif conn:
             self.conn = conn
         else:
             self.db_file = default_db_file
             self.conn = sqlite3.connect(default_db_file)
 
-        self.create_tables()
-        self.create_indexes()
+        if create_schema:
+            MigrationRunner(self.conn).run()
 
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY,
-                discord_id TEXT UNIQUE,
-                streamer TEXT,
-                username TEXT UNIQUE
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS guilds (
-                guild_id TEXT UNIQUE,
-                name TEXT,
-                prefix TEXT,
-                role_to_add TEXT
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS config (
-                id INTEGER PRIMARY KEY,
-                version TEXT,
-                prefix TEXT,
-                bot_owner_id TEXT,
-                time TEXT
-            )
-        ''')
-        self.conn.commit()
+    @staticmethod
+    def get_default_db_file():
+        app_data_dir = os.getenv('APPDATA')
+        db_folder = os.path.join(app_data_dir, "TwitchDiscordNotifications")
 
-    def create_indexes(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS streamer_index ON users (streamer);
-        ''')
-        self.conn.commit()
+        if not os.path.exists(db_folder):
+            os.makedirs(db_folder)
+
+        return os.path.join(db_folder, "data.db")
+
+    @staticmethod
+    def normalize_streamer(streamer):
+        return streamer.strip().lower()
 
     def get_info_by_discord_id(self, discord_id):
         cursor = self.conn.cursor()
@@ -78,53 +60,86 @@ class SQLiteHandler:
         return row[0] if row else None
 
     def add_user(self, user_data):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT OR IGNORE INTO users (discord_id, streamer, username)
-            VALUES (?, ?, ?)
-        ''', (
-            user_data['discord_id'],
-            user_data['streamer_list'][0],
-            user_data['discord_username']
-        ))
-
-        if cursor.rowcount > 0:
-            self.conn.commit()
-            return True
-        else:
-            return False
+        with self.conn:
+            cursor = self.conn.execute('''
+                INSERT OR IGNORE INTO users (discord_id, username)
+                VALUES (?, ?)
+            ''', (
+                user_data['discord_id'],
+                user_data['discord_username']
+            ))
+            if cursor.rowcount == 0:
+                return False
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO subscriptions (discord_id, streamer) VALUES (?, ?)",
+                [(user_data['discord_id'], self.normalize_streamer(streamer))
+                 for streamer in user_data['streamer_list']])
+        return True
 
     def delete_user(self, discord_id):
-        cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM users WHERE discord_id = ?', (discord_id,))
+        with self.conn:
+            cursor = self.conn.execute(
+                'DELETE FROM users WHERE discord_id = ?', (discord_id,))
+            if cursor.rowcount == 0:
+                return False
+            self.conn.execute(
+                'DELETE FROM subscriptions WHERE discord_id = ?', (discord_id,))
+        return True
+
+    def select_in_chunks(self, query, fixed_params, values, chunk_size=500):
+        """Run `query`, which ends in `IN ({})`, over `values` in chunks below SQLite's variable limit."""
+        values = list(values)
+        rows = []
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            rows.extend(self.conn.execute(
+                query.format(",".join("?" * len(chunk))), (*fixed_params, *chunk)).fetchall())
+        return rows
 
-        if cursor.rowcount > 0:
-            self.conn.commit()
-            return True
-        else:
-            return False
+    def get_existing_user_ids(self, discord_ids):
+        """Return the subset of `discord_ids` that are registered."""
+        rows = self.select_in_chunks(
+            "SELECT discord_id FROM users WHERE discord_id IN ({})", (), set(discord_ids))
+        return {row[0] for row in rows}
+
+    def add_streamers_to_user(self, discord_id, streamers):
+        """
+        Add every streamer in `streamers` to a user's watchlist in one
+        transaction and return the ones that were not already on it, in
+        the order given.
+        """
+        streamers = list(dict.fromkeys(
+            self.normalize_streamer(streamer) for streamer in streamers if streamer.strip()))
+        with self.conn:
+            existing = {row[0] for row in self.select_in_chunks(
+                "SELECT streamer FROM subscriptions WHERE discord_id = ? AND streamer IN ({})",
+                (discord_id,), streamers)}
+            added = [streamer for streamer in streamers if streamer not in existing]
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO subscriptions (discord_id, streamer) VALUES (?, ?)",
+                [(discord_id, streamer) for streamer in added])
+        return added
+
+    def remove_streamers_from_user(self, discord_id, streamers):
+        """Remove `streamers` from a user's watchlist in one transaction and return the ones removed."""
+        streamers = list(dict.fromkeys(
+            self.normalize_streamer(streamer) for streamer in streamers if streamer.strip()))
+        with self.conn:
+            existing = {row[0] for row in self.select_in_chunks(
+                "SELECT streamer FROM subscriptions WHERE discord_id = ? AND streamer IN ({})",
+                (discord_id,), streamers)}
+            removed = [streamer for streamer in streamers if streamer in existing]
+            self.conn.executemany(
+                "DELETE FROM subscriptions WHERE discord_id = ? AND streamer = ?",
+                [(discord_id, streamer) for streamer in removed])
+        return removed
 
     def add_streamer_to_user(self, discord_id, streamer):
         try:
             cursor = self.conn.cursor()
             cursor.execute(
-                'SELECT streamer FROM users WHERE discord_id = ?', (discord_id,))
-            current_value = cursor.fetchone()
-
-            if current_value is None:
-                new_value = streamer
-            else:
-                current_value = current_value[0]
-                streamers = current_value.split(',') if current_value else []
-
-                if streamer not in streamers:
-                    streamers.append(streamer)
-                    new_value = ','.join(streamers)
-                else:
-                    new_value = current_value
-
-            cursor.execute(
-                'UPDATE users SET streamer = ? WHERE discord_id = ?', (new_value, discord_id))
+                'INSERT OR IGNORE INTO subscriptions (discord_id, streamer) VALUES (?, ?)',
+                (discord_id, self.normalize_streamer(streamer)))
             self.conn.commit()
             cursor.close()
             return True
@@ -135,65 +150,70 @@ class SQLiteHandler:
     def remove_streamer_from_user(self, discord_id, streamer):
         cursor = self.conn.cursor()
         cursor.execute(
-            'SELECT streamer FROM users WHERE discord_id = ?', (discord_id,))
-        current_value = cursor.fetchone()
-
-        if current_value is not None:
-            current_value = current_value[0]
-            streamers = current_value.split(',')
-            if streamer in streamers:
-                streamers.remove(streamer)
-                new_value = ','.join(streamers)
-                cursor.execute(
-                    'UPDATE users SET streamer = ? WHERE discord_id = ?', (new_value, discord_id))
-                self.conn.commit()
-                return True
+            'DELETE FROM subscriptions WHERE discord_id = ? AND streamer = ?',
+            (discord_id, self.normalize_streamer(streamer)))
 
-        return False
+        if cursor.rowcount > 0:
+            self.conn.commit()
+            return True
+        else:
+            return False
 
     @Utilities.custom_decorators.performance_tracker
     def get_streamers_for_user(self, discord_id):
         cursor = self.conn.cursor()
         cursor.execute(
-            "SELECT streamer FROM users WHERE discord_id = ?", (discord_id,))
-        streamers_string = cursor.fetchone()
-
-        return streamers_string[0].split(',') if streamers_string else []
+            "SELECT streamer FROM subscriptions WHERE discord_id = ? ORDER BY id", (discord_id,))
+        return [row[0] for row in cursor.fetchall()]
 
     @Utilities.custom_decorators.performance_tracker
     def get_all_streamers(self):
         cursor = self.conn.cursor()
-        cursor.execute("SELECT DISTINCT streamer FROM users")
-        unique_streamers_set = set()
-
-        for row in cursor.fetchall():
-            streamers = row[0].split(',')
-            unique_streamers_set.update(streamers)
-
-        unique_streamers_list = list(unique_streamers_set)
-        return unique_streamers_list
+        cursor.execute("SELECT DISTINCT streamer FROM subscriptions")
+        return [row[0] for row in cursor.fetchall()]
 
     @Utilities.custom_decorators.performance_tracker
-    def get_user_ids_with_streamers(self):
+    def get_subscribers(self, streamer):
         cursor = self.conn.cursor()
-        cursor.execute("SELECT discord_id, streamer FROM users")
-        rows = cursor.fetchall()
-
-        user_ids_with_streamers = {}
-
-        def process_row(row):
-            discord_id, streamers_string = row
-            streamers_list = streamers_string.split(',')
+        cursor.execute(
+            "SELECT discord_id FROM subscriptions WHERE streamer = ?",
+            (self.normalize_streamer(streamer),))
+        return [row[0] for row in cursor.fetchall()]
+
+    def iter_subscriptions(self, batch_size=1000):
+        """
+        Yield every (discord_id, streamer) pair, grouped by user.
+
+        Rows are read straight off the (discord_id, streamer) index in
+        batches of `batch_size`, so memory stays flat however large the
+        table is.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT discord_id, streamer FROM subscriptions ORDER BY discord_id, streamer")
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
 
-            if discord_id not in user_ids_with_streamers:
-                user_ids_with_streamers[discord_id] = streamers_list
-            else:
-                user_ids_with_streamers[discord_id].extend(streamers_list)
+    def iter_user_watchlists(self, batch_size=1000):
+        """Yield (discord_id, [streamers]) for each user with at least one subscription."""
+        for discord_id, pairs in itertools.groupby(
+                self.iter_subscriptions(batch_size), key=operator.itemgetter(0)):
+            yield discord_id, [streamer for _, streamer in pairs]
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            executor.map(process_row, rows)
+    @Utilities.custom_decorators.performance_tracker
+    def get_user_ids_with_streamers(self):
+        return dict(self.iter_user_watchlists())
 
-        return user_ids_with_streamers
+    def count_subscriptions(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM subscriptions")
+        return cursor.fetchone()[0]
 
     @Utilities.custom_decorators.performance_tracker
     def get_all_user_ids(self):
@@ -202,6 +222,77 @@ class SQLiteHandler:
         user_ids = [row[0] for row in cursor.fetchall()]
         return user_ids
 
+    def get_streamer_metadata(self, logins):
+        """
+        Return {login: (helix user dict, fetched_at)} for the logins that have
+        stored metadata. Logins Helix did not know have None instead of a dict.
+        """
+        rows = self.select_in_chunks(
+            "SELECT login, data, fetched_at FROM streamers WHERE login IN ({})",
+            (), {self.normalize_streamer(login) for login in logins})
+        return {
+            login: (json.loads(data) if data else None, fetched_at)
+            for login, data, fetched_at in rows
+        }
+
+    def save_streamer_metadata(self, users, fetched_at=None):
+        """Upsert Helix user objects, keyed on their login."""
+        fetched_at = fetched_at or time.time()
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO streamers (login, id, display_name, profile_image_url, data, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(login) DO UPDATE SET
+                    id = excluded.id,
+                    display_name = excluded.display_name,
+                    profile_image_url = excluded.profile_image_url,
+                    data = excluded.data,
+                    fetched_at = excluded.fetched_at
+            ''', [
+                (user["login"].lower(), user.get("id"), user.get("display_name"),
+                 user.get("profile_image_url"), json.dumps(user), fetched_at)
+                for user in users
+            ])
+
+    def save_missing_streamers(self, logins, fetched_at=None):
+        """Record logins Helix returned nothing for, so they expire like any other row."""
+        fetched_at = fetched_at or time.time()
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO streamers (login, id, display_name, profile_image_url, data, fetched_at)
+                VALUES (?, NULL, NULL, NULL, NULL, ?)
+                ON CONFLICT(login) DO UPDATE SET
+                    id = NULL,
+                    display_name = NULL,
+                    profile_image_url = NULL,
+                    data = NULL,
+                    fetched_at = excluded.fetched_at
+            ''', [(self.normalize_streamer(login), fetched_at) for login in logins])
+
+    def get_stale_streamers(self, older_than, limit=1000):
+        """Watched streamers with no metadata or metadata fetched before `older_than`, oldest first."""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT watched.streamer
+            FROM (SELECT DISTINCT streamer FROM subscriptions) AS watched
+            LEFT JOIN streamers ON streamers.login = watched.streamer
+            WHERE streamers.fetched_at IS NULL OR streamers.fetched_at < ?
+            ORDER BY streamers.fetched_at
+            LIMIT ?
+        ''', (older_than, limit))
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_broadcaster_ids(self):
+        """Map Twitch user id -> login for every watched streamer with stored metadata."""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT streamers.id, streamers.login
+            FROM streamers
+            WHERE streamers.id IS NOT NULL
+              AND streamers.login IN (SELECT streamer FROM subscriptions)
+        ''')
+        return dict(cursor.fetchall())
+
     def set_version(self, new_version):
         cursor = self.conn.cursor()
         cursor.execute("""
@@ -325,6 +416,171 @@ class SQLiteHandler:
             "UPDATE guilds SET prefix = ? WHERE guild_id = ?", (new_prefix, guild_id))
         self.conn.commit()
 
+    def enqueue_outbox(self, stream_id, streamer, payload, recipients):
+        """Store one rendered notification and a pending row per recipient in a single transaction."""
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO outbox_payloads (stream_id, streamer, payload, created_at) VALUES (?, ?, ?, ?)",
+                (stream_id, streamer, payload, now))
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO outbox (stream_id, recipient, updated_at) VALUES (?, ?, ?)",
+                [(stream_id, str(recipient), now) for recipient in recipients])
+        return cursor.rowcount
+
+    def claim_outbox_batch(self, limit=500):
+        """Mark up to `limit` due rows as sending and return them with their payloads."""
+        now = time.time()
+        with self.conn:
+            rows = self.conn.execute('''
+                SELECT outbox.id, outbox.stream_id, outbox.recipient, outbox.attempts,
+                       outbox_payloads.streamer, outbox_payloads.payload
+                FROM outbox JOIN outbox_payloads USING (stream_id)
+                WHERE outbox.status = 'pending' AND outbox.next_attempt_at <= ?
+                ORDER BY outbox.id
+                LIMIT ?
+            ''', (now, limit)).fetchall()
+            self.conn.executemany(
+                "UPDATE outbox SET status = 'sending', updated_at = ? WHERE id = ?",
+                [(now, row[0]) for row in rows])
+        return rows
+
+    def complete_outbox(self, ids, status="sent"):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE id = ?",
+                [(status, now, row_id) for row_id in ids])
+
+    def retry_outbox(self, ids, max_attempts=5, base_delay=30):
+        """Put failed rows back with exponential backoff, or give up after `max_attempts`."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany('''
+                UPDATE outbox
+                SET attempts = attempts + 1,
+                    status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+                    next_attempt_at = ? + ? * (1 << attempts),
+                    updated_at = ?
+                WHERE id = ?
+            ''', [(max_attempts, now, base_delay, now, row_id) for row_id in ids])
+
+    def reset_outbox_in_flight(self):
+        """Rows left in 'sending' by a crash or restart are replayed."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE outbox SET status = 'pending' WHERE status = 'sending'")
+        return cursor.rowcount
+
+    def count_pending_outbox(self):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM outbox WHERE status IN ('pending', 'sending')")
+        return cursor.fetchone()[0]
+
+    def purge_outbox(self, older_than):
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM outbox WHERE status IN ('sent', 'failed') AND updated_at < ?",
+                (older_than,))
+            self.conn.execute(
+                "DELETE FROM outbox_payloads WHERE created_at < ? AND stream_id NOT IN (SELECT stream_id FROM outbox)",
+                (older_than,))
+
+    def save_stream_sessions(self, sessions, ended):
+        """
+        Write one poll cycle of session changes in a single transaction.
+
+        `ended` holds (ended_at, streamer) rows closing sessions opened in an
+        earlier cycle; `sessions` holds (streamer, stream_id, started_at,
+        ended_at, peak_viewers, game) rows for streams seen in this one.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE stream_sessions SET ended_at = ? WHERE streamer = ? AND ended_at IS NULL",
+                ended)
+            self.conn.executemany('''
+                INSERT INTO stream_sessions (streamer, stream_id, started_at, ended_at, peak_viewers, game)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(streamer, stream_id) DO UPDATE SET
+                    ended_at = excluded.ended_at,
+                    peak_viewers = MAX(peak_viewers, excluded.peak_viewers),
+                    game = COALESCE(excluded.game, game)
+            ''', sessions)
+
+    def get_open_stream_sessions(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT DISTINCT streamer FROM stream_sessions WHERE ended_at IS NULL")
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_start_hour_counts(self, streamer=None):
+        """
+        Count go-lives per hour of the week, from stored sessions and the
+        totals compacted out of them.
+
+        Returns:
+            list: (streamer, hour_of_week, starts) rows, for one streamer or all.
+        """
+        where = "WHERE streamer = ?" if streamer is not None else ""
+        params = (streamer, streamer) if streamer is not None else ()
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT streamer, hour_of_week, SUM(starts)
+            FROM (
+                SELECT streamer, {HOUR_OF_WEEK_SQL} AS hour_of_week, COUNT(*) AS starts
+                FROM stream_sessions {where}
+                GROUP BY streamer, hour_of_week
+                UNION ALL
+                SELECT streamer, hour_of_week, starts FROM stream_start_hours {where}
+            )
+            GROUP BY streamer, hour_of_week
+        ''', params)
+        return cursor.fetchall()
+
+    def get_stream_session_summary(self, streamer, since=0):
+        """Aggregate a streamer's sessions that started after `since`."""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT COUNT(*), AVG(ended_at - started_at), AVG(peak_viewers), MAX(peak_viewers), MAX(started_at)
+            FROM stream_sessions
+            WHERE streamer = ? AND started_at >= ?
+        ''', (streamer, since))
+        sessions, avg_duration, avg_viewers, peak_viewers, last_started_at = cursor.fetchone()
+        cursor.execute('''
+            SELECT game FROM stream_sessions
+            WHERE streamer = ? AND started_at >= ? AND game IS NOT NULL AND game != ''
+            GROUP BY game ORDER BY COUNT(*) DESC LIMIT 1
+        ''', (streamer, since))
+        game = cursor.fetchone()
+        return {
+            "sessions": sessions,
+            "avg_duration": avg_duration,
+            "avg_viewers": avg_viewers,
+            "peak_viewers": peak_viewers,
+            "last_started_at": last_started_at,
+            "top_game": game[0] if game else None,
+        }
+
+    def compact_stream_sessions(self, older_than):
+        """
+        Fold sessions that started before `older_than` into the per-hour
+        start counts and delete them. Returns the number of sessions removed.
+        """
+        with self.conn:
+            self.conn.execute(f'''
+                INSERT INTO stream_start_hours (streamer, hour_of_week, starts)
+                SELECT streamer, {HOUR_OF_WEEK_SQL} AS hour_of_week, COUNT(*)
+                FROM stream_sessions
+                WHERE started_at < ?
+                GROUP BY streamer, hour_of_week
+                ON CONFLICT(streamer, hour_of_week) DO UPDATE SET starts = starts + excluded.starts
+            ''', (older_than,))
+            removed = self.conn.execute(
+                "DELETE FROM stream_sessions WHERE started_at < ?", (older_than,)).rowcount
+            self.conn.execute(
+                "DELETE FROM stream_start_hours WHERE streamer NOT IN (SELECT streamer FROM subscriptions)")
+        return removed
+
     def save_to_temp_json(self, data):
         temp_dir = tempfile.gettempdir()
         folder_name = "TwitchDiscordNotifications"
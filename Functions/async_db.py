@@ -0,0 +1,140 @@
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+
+from Functions.Sql_handler import SQLiteHandler
+
+PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+READ_METHODS = frozenset({
+    "select_in_chunks",
+    "get_info_by_discord_id",
+    "get_username_by_discord_id",
+    "get_streamers_for_user",
+    "get_all_streamers",
+    "get_subscribers",
+    "get_user_ids_with_streamers",
+    "count_subscriptions",
+    "get_all_user_ids",
+    "get_existing_user_ids",
+    "get_version",
+    "get_prefix",
+    "get_time",
+    "get_bot_owner_id",
+    "is_guild_in_config",
+    "get_guild_prefix",
+    "get_role_to_add",
+    "count_pending_outbox",
+    "get_streamer_metadata",
+    "get_stale_streamers",
+    "get_broadcaster_ids",
+    "get_open_stream_sessions",
+    "get_start_hour_counts",
+    "get_stream_session_summary",
+})
+
+
+class AsyncSQLiteHandler:
+    """
+    Awaitable front for SQLiteHandler so queries never run on the event loop.
+
+    Writes are serialised on one writer thread that owns the only read-write
+    connection; reads are spread over a pool of read-only connections. The
+    database runs in WAL mode, so readers never wait for the writer and a
+    commit only appends to the log instead of fsyncing the main file.
+
+    Any SQLiteHandler method can be awaited on this object, e.g.
+    `await bot.db.get_all_streamers()`; methods in READ_METHODS go to the
+    reader pool and everything else to the writer.
+    """
+
+    def __init__(self, db_file=None, readers=4):
+        self.db_file = os.path.abspath(db_file or SQLiteHandler.get_default_db_file())
+        started = time.perf_counter()
+        writer_conn = self.connect()
+        writer_conn.execute("PRAGMA journal_mode = WAL")
+        self.writer = SQLiteHandler(conn=writer_conn)
+        self.schema_time = time.perf_counter() - started
+        self.write_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="db-writer")
+        self.read_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="db-reader", initializer=self.open_reader)
+        self.local = threading.local()
+        self.reader_handlers = []
+        self.reads = 0
+        self.writes = 0
+        self.write_time = 0.0
+
+    def connect(self, read_only=False):
+        if read_only:
+            uri = f"{pathlib.Path(self.db_file).as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def open_reader(self):
+        handler = SQLiteHandler(conn=self.connect(read_only=True), create_schema=False)
+        self.local.handler = handler
+        self.reader_handlers.append(handler)
+
+    def run_read(self, name, args, kwargs):
+        return getattr(self.local.handler, name)(*args, **kwargs)
+
+    def run_write(self, name, args, kwargs):
+        started = time.perf_counter()
+        try:
+            return getattr(self.writer, name)(*args, **kwargs)
+        finally:
+            self.write_time += time.perf_counter() - started
+
+    async def read(self, name, *args, **kwargs):
+        self.reads += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            self.read_executor, self.run_read, name, args, kwargs)
+
+    async def write(self, name, *args, **kwargs):
+        self.writes += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            self.write_executor, self.run_write, name, args, kwargs)
+
+    def __getattr__(self, name):
+        method = getattr(SQLiteHandler, name, None)
+        if not callable(method):
+            raise AttributeError(name)
+        if inspect.isgeneratorfunction(method):
+            # A generator would keep using a pooled connection after the call returns
+            raise AttributeError(f"{name} streams rows; call it on a SQLiteHandler instead")
+        dispatch = self.read if name in READ_METHODS else self.write
+        return functools.partial(dispatch, name)
+
+    def close(self):
+        self.write_executor.shutdown(wait=True)
+        self.read_executor.shutdown(wait=True)
+        for handler in self.reader_handlers:
+            handler.conn.close()
+        self.writer.conn.close()
+
+    def get_stats(self):
+        return {
+            "reads": self.reads,
+            "writes": self.writes,
+            "write_time_avg": self.write_time / self.writes if self.writes else 0.0,
+            "readers": len(self.reader_handlers),
+            "connections": 1 + len(self.reader_handlers),
+            "schema_time": self.schema_time,
+        }
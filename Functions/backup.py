@@ -0,0 +1,171 @@
+import gzip
+import lzma
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "lzma": ".xz"}
+REQUIRED_TABLES = ("users", "subscriptions", "guilds", "config")
+
+
+def open_compressed(path, mode, compression=None):
+    """Open a backup file, picking the compression from its suffix unless given."""
+    if compression is None:
+        compression = next(
+            (name for name, suffix in COMPRESSION_SUFFIXES.items() if suffix and path.endswith(suffix)),
+            "none")
+    if compression == "gzip":
+        return gzip.open(path, mode, compresslevel=6)
+    if compression == "lzma":
+        return lzma.open(path, mode)
+    return open(path, mode)
+
+
+class BackupManager:
+    """
+    Consistent backups of the live database.
+
+    Uses SQLite's online backup API, copying `pages_per_step` pages at a
+    time and releasing the database between steps, so writers are never
+    blocked for the whole copy and the result is never a torn file. All
+    methods block and are meant to be run off the event loop thread
+    (asyncio.to_thread).
+
+    In incremental mode a backup is skipped when PRAGMA data_version shows
+    that no connection has committed since the previous one.
+    """
+
+    def __init__(self, db_file, backup_folder, retention=12, compression="gzip",
+                 incremental=True, pages_per_step=1024, step_sleep=0.001):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown backup compression: {compression}")
+        self.db_file = db_file
+        self.backup_folder = backup_folder
+        self.retention = retention
+        self.compression = compression
+        self.incremental = incremental
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        # data_version only moves for commits made by *other* connections,
+        # so the monitor has to stay open between backups
+        self.monitor = None
+        self.last_data_version = None
+        self.created = 0
+        self.skipped = 0
+        self.last_backup = None
+
+    def data_version(self):
+        if self.monitor is None:
+            self.monitor = sqlite3.connect(self.db_file, check_same_thread=False)
+        return self.monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def create_backup(self):
+        """
+        Write one backup and apply retention.
+
+        Returns:
+            dict: Path, size and timings of the new backup, or None if the
+            database had not changed since the last one.
+        """
+        data_version = self.data_version()
+        if self.incremental and data_version == self.last_data_version:
+            self.skipped += 1
+            return None
+
+        os.makedirs(self.backup_folder, exist_ok=True)
+        name = f"backup_{time.strftime('%Y-%m-%d_%H-%M-%S')}.db"
+        final_path = os.path.join(
+            self.backup_folder, name + COMPRESSION_SUFFIXES[self.compression])
+        copy_path = os.path.join(self.backup_folder, name + ".tmp")
+
+        started = time.perf_counter()
+        source = sqlite3.connect(self.db_file)
+        target = sqlite3.connect(copy_path)
+        try:
+            source.backup(target, pages=self.pages_per_step, sleep=self.step_sleep)
+        finally:
+            target.close()
+            source.close()
+        copied = time.perf_counter()
+
+        if self.compression == "none":
+            os.replace(copy_path, final_path)
+        else:
+            packed_path = final_path + ".tmp"
+            with open(copy_path, "rb") as raw, \
+                    open_compressed(packed_path, "wb", self.compression) as packed:
+                shutil.copyfileobj(raw, packed, 1024 * 1024)
+            os.replace(packed_path, final_path)
+            os.remove(copy_path)
+        finished = time.perf_counter()
+
+        self.last_data_version = data_version
+        self.created += 1
+        self.last_backup = {
+            "path": final_path,
+            "size": os.path.getsize(final_path),
+            "copy_time": copied - started,
+            "compress_time": finished - copied,
+            "created_at": time.time(),
+        }
+        self.apply_retention()
+        return self.last_backup
+
+    def list_backups(self):
+        if not os.path.isdir(self.backup_folder):
+            return []
+        return sorted(
+            (name for name in os.listdir(self.backup_folder)
+             if name.startswith("backup_") and not name.endswith(".tmp")),
+            reverse=True,
+        )
+
+    def apply_retention(self):
+        for name in self.list_backups()[self.retention:]:
+            os.remove(os.path.join(self.backup_folder, name))
+
+    def verify_backup(self, path):
+        """
+        Restore `path` into a scratch file and check it.
+
+        Returns:
+            tuple: (ok, message) where message is "ok" or what failed.
+        """
+        with tempfile.TemporaryDirectory() as scratch:
+            restored = os.path.join(scratch, "restore.db")
+            try:
+                with open_compressed(path, "rb") as packed, open(restored, "wb") as raw:
+                    shutil.copyfileobj(packed, raw, 1024 * 1024)
+            except (OSError, EOFError, lzma.LZMAError) as e:
+                return False, f"Could not decompress backup: {e}"
+
+            conn = sqlite3.connect(restored)
+            try:
+                result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+                if result != "ok":
+                    return False, f"Integrity check failed: {result}"
+                tables = {row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'")}
+                missing = [table for table in REQUIRED_TABLES if table not in tables]
+                if missing:
+                    return False, f"Missing tables: {', '.join(missing)}"
+            except sqlite3.DatabaseError as e:
+                return False, f"Not a valid database: {e}"
+            finally:
+                conn.close()
+        return True, "ok"
+
+    def close(self):
+        if self.monitor is not None:
+            self.monitor.close()
+            self.monitor = None
+
+    def get_stats(self):
+        return {
+            "created": self.created,
+            "skipped": self.skipped,
+            "kept": len(self.list_backups()),
+            "last_backup": self.last_backup,
+        }
@@ -0,0 +1,43 @@
+import time
+
+import Functions.others
+
+SNAPSHOT_KEYS = (
+    "console_width",
+    "processed_streamers",
+    "version",
+    "date_format",
+    "loaded_commands",
+    "failed_commands",
+)
+
+
+class BotState:
+    """
+    Runtime values shared between TwitchDiscordBot, the cogs and the
+    Functions.others helpers, handed out as `bot.state`.
+
+    Everything is read straight from memory. The lists are the bot's own
+    lists, not copies, so readers always see the current contents.
+    `write_snapshot` pickles the non-secret values to variables.pkl for
+    readers in other processes such as the UI.
+    """
+
+    def __init__(self, version, console_width, date_format, processed_streamers,
+                 loaded_commands, failed_commands):
+        self.version: str = version
+        self.console_width: int = console_width
+        self.date_format: str = date_format
+        self.processed_streamers: list = processed_streamers
+        self.loaded_commands: list = loaded_commands
+        self.failed_commands: list = failed_commands
+        self.snapshots = 0
+        self.last_snapshot = None
+
+    def snapshot(self):
+        return {key: getattr(self, key) for key in SNAPSHOT_KEYS}
+
+    def write_snapshot(self):
+        Functions.others.pickle_variable(self.snapshot())
+        self.snapshots += 1
+        self.last_snapshot = time.time()
@@ -0,0 +1,207 @@
+import asyncio
+import functools
+import itertools
+import time
+from collections import deque
+
+import discord
+
+PRIORITY_LIVE_ALERT = 0
+PRIORITY_COMMAND_REPLY = 1
+
+
+class TokenBucket:
+    def __init__(self, rate, per):
+        self.capacity = rate
+        self.refill_rate = rate / per
+        self.tokens = float(rate)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+
+    def is_idle(self):
+        self.refill()
+        return self.tokens >= self.capacity and time.monotonic() >= self.paused_until
+
+    def pause(self, seconds):
+        self.tokens = 0
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def take(self):
+        while True:
+            self.refill()
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+
+
+class DeliveryJob:
+    __slots__ = ("priority", "route", "send", "description", "key", "tags", "enqueued_at", "attempts")
+
+    def __init__(self, priority, route, send, description, key, tags=None):
+        self.priority = priority
+        self.route = route
+        self.send = send
+        self.description = description
+        self.key = key
+        self.tags = tags or {}
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+
+class DeliveryQueue:
+    """
+    Bounded priority queue of Discord sends drained by a pool of workers.
+
+    Every send takes a token from a global bucket (kept under Discord's
+    50 requests/s) and from a bucket for its route, so a large fan-out is
+    paced instead of colliding with the global limit. `put` blocks while the
+    queue is full, which pushes back on the producer. 429s pause the bucket
+    that was hit and Discord 5xx errors are retried with exponential backoff.
+    """
+
+    def __init__(self, workers=4, max_queue_size=50000, global_rate=45,
+                 route_rate=5, route_per=5, max_attempts=3, on_failure=None):
+        self.worker_count = workers
+        self.queue = asyncio.PriorityQueue(maxsize=max_queue_size)
+        self.global_bucket = TokenBucket(global_rate, 1)
+        self.route_rate = route_rate
+        self.route_per = route_per
+        self.route_buckets = {}
+        self.max_attempts = max_attempts
+        self.on_failure = on_failure
+        self.workers = []
+        self._counter = itertools.count()
+        self.in_flight = 0
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.queue_latencies = deque(maxlen=1000)
+        self.send_latencies = deque(maxlen=1000)
+
+    def start(self):
+        if not self.workers:
+            self.workers = [
+                asyncio.create_task(self.worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def put(self, send, route, priority=PRIORITY_LIVE_ALERT, description=None, key=None, tags=None):
+        """
+        Queue `send`, a zero-argument coroutine function, for delivery.
+        Waits while the queue is full. `key` and `tags` (a dict) are handed
+        back to `on_failure` on the job.
+        """
+        job = DeliveryJob(priority, route, send, description, key, tags)
+        await self.queue.put((priority, next(self._counter), job))
+
+    async def reply(self, ctx, **kwargs):
+        """Queue `ctx.send(**kwargs)`; it goes out after any live alerts already waiting."""
+        await self.put(
+            functools.partial(ctx.send, **kwargs),
+            route=f"channel:{ctx.channel.id}",
+            priority=PRIORITY_COMMAND_REPLY,
+            description=f"{ctx.command} reply to {ctx.author.name}",
+        )
+
+    async def requeue(self, job, delay):
+        await asyncio.sleep(delay)
+        await self.queue.put((job.priority, next(self._counter), job))
+
+    def route_bucket(self, route):
+        bucket = self.route_buckets.get(route)
+        if bucket is None:
+            if len(self.route_buckets) > 10000:
+                self.route_buckets = {
+                    key: value for key, value in self.route_buckets.items()
+                    if not value.is_idle()
+                }
+            bucket = self.route_buckets[route] = TokenBucket(
+                self.route_rate, self.route_per)
+        return bucket
+
+    async def worker(self):
+        while True:
+            _, _, job = await self.queue.get()
+            try:
+                await self.deliver(job)
+            finally:
+                self.queue.task_done()
+
+    async def deliver(self, job):
+        route_bucket = self.route_bucket(job.route)
+        await route_bucket.take()
+        await self.global_bucket.take()
+
+        job.attempts += 1
+        started = time.monotonic()
+        self.in_flight += 1
+        try:
+            await job.send()
+        except discord.HTTPException as e:
+            if e.status == 429:
+                self.rate_limited += 1
+                retry_after = getattr(e, "retry_after", None) or 1
+                if "global" in str(e.text).lower():
+                    self.global_bucket.pause(retry_after)
+                else:
+                    route_bucket.pause(retry_after)
+            if (e.status == 429 or e.status >= 500) and job.attempts < self.max_attempts:
+                asyncio.create_task(self.requeue(job, 2 ** (job.attempts - 1)))
+                return
+            self.failed += 1
+            if self.on_failure:
+                self.on_failure(job, e)
+            return
+        except Exception as e:
+            self.failed += 1
+            if self.on_failure:
+                self.on_failure(job, e)
+            return
+        finally:
+            self.in_flight -= 1
+
+        finished = time.monotonic()
+        self.sent += 1
+        self.queue_latencies.append(started - job.enqueued_at)
+        self.send_latencies.append(finished - started)
+
+    async def join(self):
+        await self.queue.join()
+
+    def get_stats(self):
+        def summary(values):
+            if not values:
+                return 0.0, 0.0
+            ordered = sorted(values)
+            return (sum(ordered) / len(ordered),
+                    ordered[max(int(len(ordered) * 0.95) - 1, 0)])
+
+        queue_avg, queue_p95 = summary(self.queue_latencies)
+        send_avg, send_p95 = summary(self.send_latencies)
+        return {
+            "depth": self.queue.qsize(),
+            "in_flight": self.in_flight,
+            "workers": len(self.workers),
+            "sent": self.sent,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "queue_latency_avg": queue_avg,
+            "queue_latency_p95": queue_p95,
+            "send_latency_avg": send_avg,
+            "send_latency_p95": send_p95,
+        }
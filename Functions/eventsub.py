@@ -0,0 +1,260 @@
+import asyncio
+import json
+import time
+from collections import Counter, deque
+
+import aiohttp
+from colorama import Fore
+
+import Functions.others
+from Functions.rate_limiter import PRIORITY_CACHE
+
+EVENTSUB_WS_URL = "wss://eventsub.wss.twitch.tv/ws"
+SUBSCRIPTIONS_URL = "https://api.twitch.tv/helix/eventsub/subscriptions"
+SUBSCRIPTION_TYPES = ("stream.online", "stream.offline")
+# Twitch allows this many enabled subscriptions per WebSocket connection
+MAX_SUBSCRIPTIONS = 300
+RETRY_BASE_SECONDS = 300
+RETRY_MAX_SECONDS = 6 * 3600
+# Subscriptions posted at once, so a 401/403 stops the rest quickly
+SUBSCRIBE_CHUNK = 10
+
+
+class EventSubClient:
+    """
+    EventSub WebSocket transport for stream.online / stream.offline.
+
+    `sync` keeps one subscription per type for every watched broadcaster id.
+    Subscriptions belong to a WebSocket session, so whenever the client gets a
+    welcome for a new session (first connect or after the connection dropped)
+    everything is subscribed again; a session_reconnect keeps the session id
+    and therefore its subscriptions.
+
+    Note: Twitch only accepts WebSocket subscriptions made with a user access
+    token, an app token from client_credentials is rejected with 403. A
+    401/403 therefore pauses all subscribing with an exponential backoff,
+    other failures back off per subscription, and at most MAX_SUBSCRIPTIONS
+    are requested per session; the rest stay on polling.
+    """
+
+    def __init__(self, session, helix, headers, on_online, on_offline,
+                 ws_url=EVENTSUB_WS_URL, subscriptions_url=SUBSCRIPTIONS_URL):
+        self.session = session
+        self.helix = helix
+        self.headers = headers
+        self.on_online = on_online
+        self.on_offline = on_offline
+        self.ws_url = ws_url
+        self.subscriptions_url = subscriptions_url
+        self.session_id = None
+        self.keepalive_timeout = 10
+        self.connected = False
+        self.wanted = set()
+        self.subscribed = {}  # (broadcaster_id, type) -> subscription id
+        self.failed = {}  # (broadcaster_id, type) -> (retry at, failures)
+        self.rejected_until = 0.0
+        self.rejections = 0
+        self.capped = False
+        self.seen_message_ids = deque(maxlen=500)
+        self.reconnects = 0
+        self.notifications = 0
+        self._sync_lock = asyncio.Lock()
+
+    def covered_broadcasters(self):
+        if not self.connected:
+            return set()
+        return {
+            broadcaster_id for broadcaster_id in self.wanted
+            if all((broadcaster_id, subscription_type) in self.subscribed
+                   for subscription_type in SUBSCRIPTION_TYPES)
+        }
+
+    async def run(self):
+        url = self.ws_url
+        backoff = 1
+        while True:
+            try:
+                url = await self.listen(url) or self.ws_url
+                backoff = 1
+            except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError):
+                self.connected = False
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+                url = self.ws_url
+            self.reconnects += 1
+
+    async def listen(self, url):
+        """Read one WebSocket connection until it closes. Returns a reconnect url if asked to move."""
+        async with self.session.ws_connect(url, heartbeat=None) as ws:
+            while True:
+                message = await ws.receive(timeout=self.keepalive_timeout + 5)
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    self.connected = False
+                    return None
+
+                try:
+                    data = json.loads(message.data)
+                except ValueError:
+                    continue
+                metadata = data.get("metadata", {})
+                message_id = metadata.get("message_id")
+                if message_id in self.seen_message_ids:
+                    continue
+                self.seen_message_ids.append(message_id)
+
+                message_type = metadata.get("message_type")
+                payload = data.get("payload", {})
+                if message_type == "session_welcome":
+                    await self.handle_welcome(payload["session"])
+                elif message_type == "notification":
+                    # Handlers may wait on Helix, never stall the socket for them
+                    asyncio.create_task(self.handle_notification(
+                        metadata.get("subscription_type"), payload.get("event", {})))
+                elif message_type == "session_reconnect":
+                    return payload["session"]["reconnect_url"]
+                elif message_type == "revocation":
+                    subscription = payload.get("subscription", {})
+                    broadcaster_id = subscription.get(
+                        "condition", {}).get("broadcaster_user_id")
+                    self.subscribed.pop(
+                        (broadcaster_id, subscription.get("type")), None)
+
+    async def handle_welcome(self, session):
+        self.keepalive_timeout = session.get("keepalive_timeout_seconds") or 10
+        if session["id"] != self.session_id:
+            self.session_id = session["id"]
+            self.subscribed.clear()
+            self.capped = False
+        self.connected = True
+        asyncio.create_task(self.sync(self.wanted))
+
+    async def handle_notification(self, subscription_type, event):
+        self.notifications += 1
+        login = (event.get("broadcaster_user_login") or "").lower()
+        if not login:
+            return
+        if subscription_type == "stream.online":
+            await self.on_online(login)
+        elif subscription_type == "stream.offline":
+            await self.on_offline(login)
+
+    async def sync(self, broadcaster_ids):
+        async with self._sync_lock:
+            self.wanted = set(broadcaster_ids)
+            if not self.connected:
+                return
+
+            stale = [
+                key for key in self.subscribed if key[0] not in self.wanted]
+            for key in stale:
+                await self.unsubscribe(key)
+            for key in [key for key in self.failed if key[0] not in self.wanted]:
+                del self.failed[key]
+
+            now = time.time()
+            if now < self.rejected_until:
+                return
+            missing = [
+                (broadcaster_id, subscription_type)
+                for broadcaster_id in sorted(self.wanted)
+                for subscription_type in SUBSCRIPTION_TYPES
+                if (broadcaster_id, subscription_type) not in self.subscribed
+                and self.failed.get((broadcaster_id, subscription_type), (0, 0))[0] <= now
+            ]
+            room = max(MAX_SUBSCRIPTIONS - len(self.subscribed), 0)
+            if len(missing) > room:
+                if not self.capped:
+                    self.log(
+                        f"subscription limit of {MAX_SUBSCRIPTIONS} reached, "
+                        f"{len(missing) - room} subscriptions left to polling", 3)
+                self.capped = True
+                missing = missing[:room]
+            failures = Counter()
+            for start in range(0, len(missing), SUBSCRIBE_CHUNK):
+                if time.time() < self.rejected_until:
+                    break
+                results = await asyncio.gather(
+                    *[self.subscribe(key) for key in missing[start:start + SUBSCRIBE_CHUNK]])
+                failures.update(reason for reason in results if reason)
+            if failures:
+                reasons = ", ".join(f"{reason} x{count}" for reason, count in failures.most_common())
+                self.log(f"{sum(failures.values())} subscriptions failed ({reasons}), retrying with backoff", 2)
+
+    async def subscribe(self, key):
+        """Create one subscription. Returns the failure reason, or None."""
+        broadcaster_id, subscription_type = key
+        body = {
+            "type": subscription_type,
+            "version": "1",
+            "condition": {"broadcaster_user_id": broadcaster_id},
+            "transport": {"method": "websocket", "session_id": self.session_id},
+        }
+        if time.time() < self.rejected_until:
+            return None
+        try:
+            status, data = await self.helix.post(
+                self.subscriptions_url, PRIORITY_CACHE, headers=self.headers, json=body)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return self.subscription_failed(key, type(e).__name__)
+        if status == 202 and data and data.get("data"):
+            self.subscribed[key] = data["data"][0]["id"]
+            self.failed.pop(key, None)
+            self.rejections = 0
+        elif status == 409:
+            # Already subscribed on this session; the id is only needed to unsubscribe
+            self.subscribed[key] = None
+            self.failed.pop(key, None)
+        elif status in (401, 403):
+            if time.time() < self.rejected_until:
+                return None
+            self.rejections += 1
+            delay = min(RETRY_BASE_SECONDS * 2 ** (self.rejections - 1), RETRY_MAX_SECONDS)
+            self.rejected_until = time.time() + delay
+            self.log(
+                f"subscriptions rejected with {status} ({self.error_message(data)}), "
+                f"EventSub needs a user access token; retrying in {delay // 60} min", 2)
+        else:
+            return self.subscription_failed(key, f"{status} {self.error_message(data)}")
+        return None
+
+    def subscription_failed(self, key, reason):
+        _, failures = self.failed.get(key, (0, 0))
+        failures += 1
+        delay = min(RETRY_BASE_SECONDS * 2 ** (failures - 1), RETRY_MAX_SECONDS)
+        self.failed[key] = (time.time() + delay, failures)
+        return reason
+
+    @staticmethod
+    def error_message(data):
+        if isinstance(data, dict):
+            return data.get("message") or data.get("error") or "no message"
+        return "no message"
+
+    @staticmethod
+    def log(message, holder):
+        Functions.others.log_print(
+            f"{Functions.others.get_timestamp()}{Functions.others.holders(holder)}"
+            f"{Fore.LIGHTWHITE_EX}EventSub:{Fore.RESET} {message}",
+            show_message=False,
+        )
+
+    async def unsubscribe(self, key):
+        subscription_id = self.subscribed.pop(key, None)
+        if not subscription_id:
+            return
+        try:
+            await self.helix.delete(
+                self.subscriptions_url, PRIORITY_CACHE, headers=self.headers,
+                params={"id": subscription_id})
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+
+    def get_stats(self):
+        return {
+            "connected": self.connected,
+            "subscriptions": len(self.subscribed),
+            "failed": len(self.failed),
+            "covered": len(self.covered_broadcasters()),
+            "reconnects": self.reconnects,
+            "notifications": self.notifications,
+        }
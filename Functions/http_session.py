@@ -0,0 +1,86 @@
+import aiohttp
+
+
+class HttpSessionManager:
+    """
+    Owns the single aiohttp session shared by the poller, the cache refresher
+    and the cogs, so connections to api.twitch.tv are kept alive and reused
+    instead of doing a new TCP+TLS handshake every cycle.
+    """
+
+    def __init__(self, limit=100, limit_per_host=50, ttl_dns_cache=300,
+                 keepalive_timeout=75, total_timeout=30):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.total_timeout = total_timeout
+        self.session = None
+        self.requests_sent = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def start(self):
+        """Create the session. Must be called from inside the running event loop."""
+        if self.session is not None and not self.session.closed:
+            return self.session
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(
+            self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(
+            self._on_connection_reuseconn)
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.total_timeout),
+            trace_configs=[trace_config],
+        )
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def request(self, *args, **kwargs):
+        return self.start().request(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        return self.start().get(*args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        return self.start().post(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.start().delete(*args, **kwargs)
+
+    def ws_connect(self, *args, **kwargs):
+        return self.start().ws_connect(*args, **kwargs)
+
+    def get_stats(self):
+        reuse_ratio = (
+            self.connections_reused / self.requests_sent if self.requests_sent else 0.0
+        )
+        return {
+            "requests": self.requests_sent,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": reuse_ratio,
+        }
+
+    async def _on_request_start(self, session, context, params):
+        self.requests_sent += 1
+
+    async def _on_connection_create_end(self, session, context, params):
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, context, params):
+        self.connections_reused += 1
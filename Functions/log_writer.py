@@ -0,0 +1,273 @@
+import atexit
+import gzip
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+COLOR_PATTERN = re.compile(r"(\x1b\[[0-9;]*m)|(\033\[K)")
+STOP = object()
+
+
+class RotationPolicy:
+    """
+    When a log file is rotated and how many old segments are kept.
+
+    The live file rolls over once the next line would take it past
+    `max_lines` lines or `max_bytes` bytes (whichever is set). It then
+    becomes segment 1 (`log.txt.1`, or `log.txt.1.gz` with `compress`),
+    older segments move up by one and anything past `backups` is deleted.
+    """
+
+    def __init__(self, max_lines=None, max_bytes=None, backups=5, compress=False):
+        self.max_lines = int(max_lines) if max_lines else None
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.backups = int(backups)
+        self.compress = bool(compress)
+
+    @classmethod
+    def from_settings(cls, settings, default_max_lines):
+        settings = dict(settings)
+        if not settings.get("max_lines") and not settings.get("max_bytes"):
+            settings["max_lines"] = default_max_lines
+        return cls(**settings)
+
+    def is_exceeded(self, lines, size):
+        return (self.max_lines is not None and lines > self.max_lines) or \
+            (self.max_bytes is not None and size > self.max_bytes)
+
+
+class LogFile:
+    __slots__ = ("handle", "lines", "size")
+
+    def __init__(self, lines, size):
+        self.handle = None
+        self.lines = lines
+        self.size = size
+
+
+class LogWriter:
+    """
+    Background writer behind Functions.others.log_print.
+
+    `write` only puts the line on a queue, so callers on the event loop never
+    touch the disk. One daemon thread drains the queue, strips colour codes
+    and appends each batch with a single write per file, at most
+    `flush_interval` seconds after the first line of the batch arrived.
+
+    Files stay open between batches and their line and byte counts are kept
+    in memory, so an append never has to read the file back. Files are
+    rotated into numbered segments according to their RotationPolicy;
+    `policies` maps a file name (or "*" for any other file) to a policy, or
+    is a callable returning such a dict, re-read every `policy_refresh`
+    seconds.
+    """
+
+    def __init__(self, policies=None, flush_interval=0.05, batch_size=5000, policy_refresh=5.0):
+        self.policies = policies if policies is not None else {"*": RotationPolicy(max_lines=1000)}
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.policy_refresh = policy_refresh
+        self.queue = queue.SimpleQueue()
+        self.files = {}
+        self.sinks = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="log-writer", daemon=True)
+                self.thread.start()
+                atexit.register(self.close)
+
+    def write(self, path, message):
+        self.enqueued += 1
+        self.queue.put((path, message))
+        if self.thread is None:
+            self.start()
+
+    def write_record(self, sink, record):
+        """Queue a structured record for `sink` (a JsonLinesSink)."""
+        self.enqueued += 1
+        self.queue.put((sink, record))
+        if self.thread is None:
+            self.start()
+
+    def load_policies(self):
+        return self.policies() if callable(self.policies) else self.policies
+
+    def run(self):
+        try:
+            policies = self.load_policies()
+        except (OSError, ValueError, KeyError, TypeError):
+            # A bad rotation config must not kill the thread; use the default until the next refresh
+            self.errors += 1
+            policies = {"*": RotationPolicy(max_lines=1000)}
+        policies_read = time.monotonic()
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not STOP and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            if time.monotonic() - policies_read > self.policy_refresh:
+                try:
+                    policies = self.load_policies()
+                except (OSError, ValueError, KeyError, TypeError):
+                    pass
+                policies_read = time.monotonic()
+
+            # flush() markers are Events, set once the lines before them are written
+            markers = [entry for entry in batch if not isinstance(entry, tuple)]
+            self.write_batch([entry for entry in batch if isinstance(entry, tuple)], policies)
+            for marker in markers:
+                if marker is STOP:
+                    self.close_files()
+                    return
+                marker.set()
+
+    def get_policy(self, path, policies):
+        name = os.path.basename(path)
+        return policies.get(name) or policies.get("*") or RotationPolicy(max_lines=1000)
+
+    def write_batch(self, batch, policies):
+        by_file = {}
+        by_sink = {}
+        for target, payload in batch:
+            if isinstance(target, str):
+                by_file.setdefault(target, []).append(COLOR_PATTERN.sub("", payload) + "\n")
+            else:
+                by_sink.setdefault(target, []).append(payload)
+
+        for sink, records in by_sink.items():
+            self.sinks.add(sink)
+            try:
+                sink.write_records(records)
+                self.written += len(records)
+            except (OSError, ValueError):
+                self.errors += 1
+                sink.close()
+
+        for path, lines in by_file.items():
+            try:
+                self.append(path, lines, self.get_policy(path, policies))
+                self.written += len(lines)
+            except (OSError, ValueError):
+                self.errors += 1
+                # Re-measure the file on the next write instead of trusting the counts
+                log_file = self.files.pop(path, None)
+                if log_file is not None and log_file.handle is not None:
+                    log_file.handle.close()
+        self.batches += 1
+
+    def open_file(self, path):
+        log_file = self.files.get(path)
+        if log_file is None:
+            log_file = self.files[path] = LogFile(*self.measure(path))
+        if log_file.handle is None:
+            log_file.handle = open(path, "a", encoding="utf-8")
+        return log_file
+
+    def append(self, path, lines, policy):
+        log_file = self.open_file(path)
+        chunk = []
+        for line in lines:
+            line_count = line.count("\n")
+            line_size = len(line.encode("utf-8"))
+            if log_file.lines and policy.is_exceeded(log_file.lines + line_count, log_file.size + line_size):
+                log_file.handle.write("".join(chunk))
+                chunk = []
+                self.rotate(path, log_file, policy)
+                log_file = self.open_file(path)
+            chunk.append(line)
+            log_file.lines += line_count
+            log_file.size += line_size
+        log_file.handle.write("".join(chunk))
+        log_file.handle.flush()
+
+    def rotate(self, path, log_file, policy):
+        log_file.handle.close()
+        log_file.handle = None
+        for index in range(policy.backups, 0, -1):
+            for suffix in ("", ".gz"):
+                segment = f"{path}.{index}{suffix}"
+                if not os.path.exists(segment):
+                    continue
+                if index == policy.backups:
+                    os.remove(segment)
+                else:
+                    os.replace(segment, f"{path}.{index + 1}{suffix}")
+
+        if policy.backups == 0:
+            os.remove(path)
+        elif policy.compress:
+            packed_path = f"{path}.1.gz.tmp"
+            with open(path, "rb") as raw, gzip.open(packed_path, "wb", compresslevel=6) as packed:
+                shutil.copyfileobj(raw, packed, 1024 * 1024)
+            os.replace(packed_path, f"{path}.1.gz")
+            os.remove(path)
+        else:
+            os.replace(path, f"{path}.1")
+        log_file.lines = 0
+        log_file.size = 0
+        self.rotations += 1
+
+    @staticmethod
+    def measure(path):
+        """Line count and size of an existing log file."""
+        try:
+            with open(path, "rb") as log_file:
+                lines = sum(chunk.count(b"\n") for chunk in iter(lambda: log_file.read(1 << 20), b""))
+                return lines, log_file.tell()
+        except FileNotFoundError:
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            return 0, 0
+
+    def close_files(self):
+        for log_file in self.files.values():
+            if log_file.handle is not None:
+                log_file.handle.close()
+                log_file.handle = None
+        for sink in self.sinks:
+            sink.close()
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far is on disk."""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        if self.thread is None or not self.thread.is_alive():
+            return
+        self.queue.put(STOP)
+        self.thread.join(timeout)
+
+    def get_stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "rotations": self.rotations,
+            "errors": self.errors,
+        }
@@ -0,0 +1,259 @@
+import time
+
+from colorama import Fore
+
+import Functions.others
+
+
+class Migration:
+    """
+    One numbered schema step.
+
+    `statements` run together in a single transaction. A step that also
+    needs to rewrite existing rows provides `backfill(conn, cursor,
+    chunk_size)`, which processes one chunk after the position `cursor`
+    (None on the first call) and returns `(new_cursor, rows_done)`, with a
+    new cursor of None once nothing is left. Every chunk commits on its
+    own together with its cursor, so a long backfill never holds the write
+    lock for long and picks up where it stopped after a restart. `count`
+    optionally returns the number of rows to backfill, for progress
+    reporting.
+    """
+
+    def __init__(self, version, description, statements=(), backfill=None, count=None):
+        self.version = version
+        self.description = description
+        self.statements = statements
+        self.backfill = backfill
+        self.count = count
+
+
+def backfill_subscriptions(conn, cursor, chunk_size):
+    rows = conn.execute(
+        "SELECT id, discord_id, streamer FROM users WHERE id > ? AND streamer IS NOT NULL ORDER BY id LIMIT ?",
+        (cursor or 0, chunk_size)).fetchall()
+    if not rows:
+        return None, 0
+    conn.executemany(
+        "INSERT OR IGNORE INTO subscriptions (discord_id, streamer) VALUES (?, ?)",
+        [
+            (discord_id, streamer.strip().lower())
+            for _, discord_id, streamers_string in rows
+            for streamer in streamers_string.split(',')
+            if streamer.strip()
+        ])
+    conn.executemany(
+        "UPDATE users SET streamer = NULL WHERE id = ?", [(row[0],) for row in rows])
+    return rows[-1][0], len(rows)
+
+
+def count_unmigrated_users(conn):
+    return conn.execute("SELECT COUNT(*) FROM users WHERE streamer IS NOT NULL").fetchone()[0]
+
+
+MIGRATIONS = [
+    Migration(1, "Base tables", statements=(
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            discord_id TEXT UNIQUE,
+            streamer TEXT,
+            username TEXT UNIQUE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS guilds (
+            guild_id TEXT UNIQUE,
+            name TEXT,
+            prefix TEXT,
+            role_to_add TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS config (
+            id INTEGER PRIMARY KEY,
+            version TEXT,
+            prefix TEXT,
+            bot_owner_id TEXT,
+            time TEXT
+        )
+        ''',
+    )),
+    Migration(2, "Normalized subscriptions table", statements=(
+        '''
+        CREATE TABLE IF NOT EXISTS subscriptions (
+            id INTEGER PRIMARY KEY,
+            discord_id TEXT NOT NULL,
+            streamer TEXT NOT NULL,
+            UNIQUE (discord_id, streamer)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS subscriptions_streamer_index ON subscriptions (streamer, discord_id)",
+        "DROP INDEX IF EXISTS streamer_index",
+    ), backfill=backfill_subscriptions, count=count_unmigrated_users),
+    Migration(3, "Notification outbox", statements=(
+        '''
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY,
+            stream_id TEXT,
+            recipient TEXT,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            next_attempt_at REAL DEFAULT 0,
+            updated_at REAL,
+            UNIQUE (stream_id, recipient)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS outbox_payloads (
+            stream_id TEXT PRIMARY KEY,
+            streamer TEXT,
+            payload TEXT,
+            created_at REAL
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS outbox_status_index ON outbox (status, next_attempt_at)",
+    )),
+    Migration(4, "Streamer metadata cache", statements=(
+        '''
+        CREATE TABLE IF NOT EXISTS streamers (
+            login TEXT PRIMARY KEY,
+            id TEXT,
+            display_name TEXT,
+            profile_image_url TEXT,
+            data TEXT,
+            fetched_at REAL
+        ) WITHOUT ROWID
+        ''',
+        "CREATE INDEX IF NOT EXISTS streamers_fetched_at_index ON streamers (fetched_at)",
+    )),
+    Migration(5, "Stream session history", statements=(
+        '''
+        CREATE TABLE IF NOT EXISTS stream_sessions (
+            id INTEGER PRIMARY KEY,
+            streamer TEXT NOT NULL,
+            stream_id TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            ended_at REAL,
+            peak_viewers INTEGER DEFAULT 0,
+            game TEXT,
+            UNIQUE (streamer, stream_id)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS stream_sessions_streamer_index ON stream_sessions (streamer, started_at)",
+        "CREATE INDEX IF NOT EXISTS stream_sessions_started_at_index ON stream_sessions (started_at)",
+        '''
+        CREATE TABLE IF NOT EXISTS stream_start_hours (
+            streamer TEXT NOT NULL,
+            hour_of_week INTEGER NOT NULL,
+            starts INTEGER DEFAULT 0,
+            PRIMARY KEY (streamer, hour_of_week)
+        ) WITHOUT ROWID
+        ''',
+    )),
+]
+
+
+def log_progress(migration, rows_done, total):
+    total_str = f"/{total}" if total is not None else ""
+    Functions.others.log_print(
+        f"{Functions.others.get_timestamp()}{Functions.others.holders(3)}Migration "
+        f"{Fore.LIGHTWHITE_EX}{migration.version}{Fore.RESET} ({migration.description}): "
+        f"{rows_done}{total_str} rows",
+        show_message=False,
+    )
+
+
+class MigrationRunner:
+    """
+    Brings a database up to the newest migration, keyed on PRAGMA user_version.
+
+    Migrations are written so that they are safe on databases created before
+    versioning existed, which all start at user_version 0.
+    """
+
+    def __init__(self, conn, migrations=MIGRATIONS, chunk_size=1000,
+                 progress=log_progress, progress_interval=2.0):
+        self.conn = conn
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.progress_interval = progress_interval
+
+    def current_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def pending(self):
+        current = self.current_version()
+        return [migration for migration in self.migrations if migration.version > current]
+
+    def begin(self):
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def run(self):
+        """Apply every pending migration and return the versions applied."""
+        applied = []
+        for migration in self.pending():
+            self.begin()
+            try:
+                for statement in migration.statements:
+                    self.conn.execute(statement)
+                if migration.backfill is None:
+                    self.set_version(migration.version)
+                else:
+                    self.conn.execute('''
+                        CREATE TABLE IF NOT EXISTS migration_progress (
+                            version INTEGER PRIMARY KEY,
+                            cursor,
+                            rows_done INTEGER DEFAULT 0
+                        )
+                    ''')
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+
+            if migration.backfill is not None:
+                self.run_backfill(migration)
+            applied.append(migration.version)
+        return applied
+
+    def set_version(self, version):
+        # PRAGMA does not take parameters; version always comes from MIGRATIONS
+        self.conn.execute(f"PRAGMA user_version = {int(version)}")
+
+    def run_backfill(self, migration):
+        row = self.conn.execute(
+            "SELECT cursor, rows_done FROM migration_progress WHERE version = ?",
+            (migration.version,)).fetchone()
+        cursor, rows_done = row if row else (None, 0)
+        total = migration.count(self.conn) + rows_done if migration.count else None
+        last_report = time.monotonic()
+
+        while True:
+            self.begin()
+            try:
+                cursor, rows = migration.backfill(self.conn, cursor, self.chunk_size)
+                rows_done += rows
+                if cursor is None:
+                    self.conn.execute(
+                        "DELETE FROM migration_progress WHERE version = ?", (migration.version,))
+                    self.set_version(migration.version)
+                else:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO migration_progress (version, cursor, rows_done) VALUES (?, ?, ?)",
+                        (migration.version, cursor, rows_done))
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+
+            if cursor is None:
+                if self.progress and rows_done:
+                    self.progress(migration, rows_done, total)
+                return rows_done
+            if self.progress and time.monotonic() - last_report >= self.progress_interval:
+                self.progress(migration, rows_done, total)
+                last_report = time.monotonic()
@@ -0,0 +1,67 @@
+import datetime
+from types import MappingProxyType
+
+import discord
+
+import Functions.others
+
+
+class LiveNotification:
+    """
+    One rendered live notification, shared by every recipient of the event.
+
+    The embed is built exactly once; the only per-recipient part of the
+    message is the spoiler mention returned by `mention_for`.
+    """
+
+    __slots__ = ("streamer_name", "stream_id", "embed_dict", "embed")
+
+    def __init__(self, streamer_name, stream_id, embed_dict):
+        object.__setattr__(self, "streamer_name", streamer_name)
+        object.__setattr__(self, "stream_id", stream_id)
+        object.__setattr__(self, "embed_dict", MappingProxyType(embed_dict))
+        object.__setattr__(self, "embed", discord.Embed.from_dict(embed_dict))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LiveNotification is immutable")
+
+    @staticmethod
+    def mention_for(member):
+        return f"||{member.mention}||"
+
+
+def live_stream_id(stream_data):
+    """Id of one broadcast, shared by the outbox and the rendered notification."""
+    return stream_data.get("id") or f"{stream_data.get('user_id')}:{stream_data.get('started_at')}"
+
+
+def render_live_notification(streamer_name, stream_data, profile_picture_url, version):
+    viewers = stream_data.get("viewer_count", 0)
+    fields = []
+    if stream_data.get("game_name"):
+        fields.append({"name": "Game", "value": stream_data["game_name"], "inline": True})
+    fields.append({
+        "name": "Viewers",
+        "value": "No viewers. Be the first!" if viewers == 0 else str(viewers),
+        "inline": True,
+    })
+    fields.append({"name": "Title", "value": stream_data.get("title", ""), "inline": True})
+    fields.append({
+        "name": "Stream Start Time (local)",
+        "value": Functions.others.generate_timestamp_string(stream_data["started_at"]),
+        "inline": True,
+    })
+
+    embed_dict = {
+        "type": "rich",
+        "title": f"{streamer_name} is streaming!",
+        "description": f"Click [here](https://www.twitch.tv/{streamer_name}) to watch the stream.",
+        "color": discord.Color.green().value,
+        "timestamp": datetime.datetime.now().astimezone().isoformat(),
+        "fields": fields,
+        "footer": {"text": f"{version} | Made by Beelzebub2"},
+    }
+    if profile_picture_url:
+        embed_dict["thumbnail"] = {"url": profile_picture_url}
+
+    return LiveNotification(streamer_name, live_stream_id(stream_data), embed_dict)
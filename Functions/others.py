@@ -1,18 +1,37 @@
 import re
 import os
 import datetime
+import time
 import tempfile
 from colorama import Fore
-import sys
 import pickle
 import requests
-import Utilities.custom_decorators
 from Functions.Json_config_hanldler import JsonConfigHandler
+from Functions.log_writer import LogWriter, RotationPolicy
+from Functions.structured_log import JsonLinesSink, StructuredLogReader
 from tzlocal import get_localzone
 
 cwd = os.getcwd()
 chj = JsonConfigHandler(
     os.path.join(cwd, "UI\\config.json"))
+logs_folder = os.path.join(cwd, "Logs")
+events_log_path = os.path.join(logs_folder, "events.jsonl")
+# The running bot's BotState; None in other processes (e.g. the UI)
+shared_state = None
+log_writer = None
+event_sink = None
+
+
+def get_shared_variable(name):
+    """
+    Read a shared runtime value such as the version or console width.
+
+    Comes from the bot's in-memory BotState when called inside the bot
+    process and from the variables.pkl snapshot anywhere else.
+    """
+    if shared_state is not None:
+        return getattr(shared_state, name)
+    return unpickle_variable()[name]
 
 
 def pickle_variable(data, folder="TwitchDiscordNotifications", filename="variables.pkl"):
@@ -61,49 +80,67 @@ def unpickle_variable(folder="TwitchDiscordNotifications", filename="variables.p
     return loaded_data
 
 
-def log_print(message, log_file_name="log.txt", show_message=True):
-    cwd = os.getcwd()
-
-    console_width = unpickle_variable()["console_width"]
+def load_log_policies():
+    """Rotation policy per log file name; files without one rotate at max_lines."""
     max_lines = chj.get_max_lines()
-    logs_folder = os.path.join(cwd, "Logs")
-    log_file_name = os.path.join(logs_folder, log_file_name)
+    policies = {"*": RotationPolicy(max_lines=max_lines)}
+    for file_name, settings in chj.get_log_rotation().items():
+        policies[file_name] = RotationPolicy.from_settings(settings, max_lines)
+    return policies
 
-    if not os.path.exists(logs_folder):
-        os.makedirs("Logs")
 
-    def remove_color_codes(text):
-        color_pattern = re.compile(r"(\x1b\[[0-9;]*m)|(\033\[K)")
-        return color_pattern.sub("", text)
+def get_log_writer():
+    global log_writer
+    if log_writer is None:
+        log_writer = LogWriter(policies=load_log_policies)
+    return log_writer
 
-    @Utilities.custom_decorators.run_in_thread
-    def trim_log_file():
-        try:
-            with open(log_file_name, "r", encoding="utf-8") as original_file:
-                lines = original_file.readlines()
 
-            if len(lines) >= max_lines:
-                lines_to_remove = len(lines) - max_lines + 1
-                new_lines = lines[lines_to_remove:]
-                with open(log_file_name, "w", encoding="utf-8") as updated_file:
-                    updated_file.writelines(new_lines)
+def flush_logs():
+    """Write out queued log lines; call before os.execl/os._exit, which skip atexit."""
+    if log_writer is not None:
+        log_writer.flush()
 
-        except:
-            pass
-
-    original_stdout = sys.stdout
 
+def log_print(message, log_file_name="log.txt", show_message=True):
+    """
+    Print `message` (unless show_message is False) and queue it, without
+    colour codes, for the log file `log_file_name` in the Logs folder.
+    """
     if show_message:
-        print(" " * console_width, end="\r")
+        print(" " * get_shared_variable("console_width"), end="\r")
         print(message)
-    try:
-        with open(log_file_name, "a", encoding="utf-8") as log_file:
-            sys.stdout = log_file
-            message_without_colors = remove_color_codes(message)
-            print(message_without_colors)
-        trim_log_file()
-    finally:
-        sys.stdout = original_stdout
+    get_log_writer().write(os.path.join(logs_folder, log_file_name), message)
+
+
+def log_event(event, level="info", streamer=None, user=None, latency=None, message=None, **fields):
+    """
+    Queue a structured record for Logs/events.jsonl, if structured_logs is
+    enabled. The setting is checked on every call, so turning it on or off
+    in the config takes effect while running. `latency` is in seconds and
+    stored as latency_ms.
+    """
+    global event_sink
+    if not chj.get_structured_logs():
+        return
+    if event_sink is None:
+        event_sink = JsonLinesSink(events_log_path)
+    record = {"ts": time.time(), "level": level, "event": event}
+    if streamer is not None:
+        record["streamer"] = streamer
+    if user is not None:
+        record["user"] = str(user)
+    if latency is not None:
+        record["latency_ms"] = round(latency * 1000, 1)
+    if message is not None:
+        record["message"] = message
+    record.update(fields)
+    get_log_writer().write_record(event_sink, record)
+
+
+def get_event_log_reader():
+    """Reader over Logs/events.jsonl for the UI and owner commands."""
+    return StructuredLogReader(events_log_path)
 
 
 def get_timestamp():
@@ -126,15 +163,15 @@ def generate_timestamp_string(started_at):
 
 
 def set_console_title(title):
-    variables = unpickle_variable()
+    version = get_shared_variable("version")
     if os.name == 'nt':
         try:
-            os.system(f'title {title} {variables["version"]}')
+            os.system(f'title {title} {version}')
         except Exception:
             pass
     else:
         try:
-            os.system(f'printf "\033]0;{title} {variables["version"]}\007"')
+            os.system(f'printf "\033]0;{title} {version}\007"')
         except Exception:
             pass
 
@@ -224,5 +261,35 @@ def format_elapsed_time(elapsed_time):
         return f"{minutes:2} min {seconds:2} sec"
 
 
+def chunk_list(items, size):
+    """
+    Split a list into consecutive chunks of at most `size` items.
+
+    Args:
+        items (list): The list to split.
+        size (int): The maximum number of items per chunk.
+
+    Returns:
+        list: A list of lists.
+    """
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def parse_streamer_name(streamer_name_or_link):
+    """
+    Extract a lowercase Twitch login from a name or a twitch.tv link.
+
+    Args:
+        streamer_name_or_link (str): A streamer name or https://www.twitch.tv/<name> link.
+
+    Returns:
+        str: The streamer login.
+    """
+    match = re.search(r"https://www.twitch.tv/([^\s/]+)", streamer_name_or_link)
+    streamer_name = match.group(1) if match else streamer_name_or_link
+    return streamer_name.strip().lower()
+
+
 def get_current_pid():
     return os.getpid()
@@ -0,0 +1,183 @@
+import datetime
+import time
+from collections import Counter, deque
+
+HOT = "hot"
+WARM = "warm"
+COLD = "cold"
+
+
+class StreamerPollState:
+    def __init__(self, name, now):
+        self.name = name
+        self.tier = HOT  # poll new streamers straight away to learn their state
+        self.next_due = now
+        self.last_polled = None
+        self.is_live = False
+        self.viewer_count = 0
+        self.last_live_at = None
+        self.start_hours = Counter()  # hour of the week -> observed go-lives
+
+
+class PollScheduler:
+    """
+    Decides which streamers are due for a /helix/streams check.
+
+    Every streamer gets a tier (hot/warm/cold) from its watcher count, recent
+    live history and the hours of the week it usually goes live in, and a
+    next-due time derived from that tier's interval. `due` never hands out
+    more logins per cycle than the global request budget allows; the most
+    urgent streamers are served first and the rest stay due for the next cycle.
+    """
+
+    def __init__(self, budget_per_minute=600, cycle_seconds=5, batch_size=100,
+                 intervals=None, hot_viewer_threshold=1000, recent_live_days=7):
+        self.budget_per_minute = budget_per_minute
+        self.cycle_seconds = cycle_seconds
+        self.batch_size = batch_size
+        self.intervals = intervals or {HOT: 5, WARM: 30, COLD: 300}
+        self.hot_viewer_threshold = hot_viewer_threshold
+        self.recent_live_seconds = recent_live_days * 86400
+        self.states = {}
+        self.covered = set()
+        self.reconcile_interval = 300
+        self.started = time.time()
+        self.polls = Counter()
+        self.poll_gaps = {tier: deque(maxlen=500) for tier in self.intervals}
+        self.detection_latencies = {
+            tier: deque(maxlen=500) for tier in self.intervals}
+
+    @property
+    def logins_per_cycle(self):
+        requests_per_cycle = max(
+            int(self.budget_per_minute * self.cycle_seconds / 60), 1)
+        return requests_per_cycle * self.batch_size
+
+    def sync(self, streamers, now=None):
+        now = now or time.time()
+        names = {name.strip().lower() for name in streamers if name and name.strip()}
+        for name in names - self.states.keys():
+            self.states[name] = StreamerPollState(name, now)
+        for name in self.states.keys() - names:
+            del self.states[name]
+
+    def due(self, now=None):
+        now = now or time.time()
+        rank = {tier: index for index, tier in enumerate(self.intervals)}
+        due_states = [
+            state for state in self.states.values() if state.next_due <= now]
+        due_states.sort(key=lambda state: (rank[state.tier], state.next_due))
+        return [state.name for state in due_states[:self.logins_per_cycle]]
+
+    def record(self, name, stream_data, now=None):
+        state = self.states.get(name)
+        if state is None:
+            return
+        now = now or time.time()
+        previously_polled = state.last_polled is not None
+        if previously_polled:
+            self.poll_gaps[state.tier].append(now - state.last_polled)
+        self.polls[state.tier] += 1
+        state.last_polled = now
+
+        if stream_data:
+            started_at = self.parse_started_at(stream_data.get("started_at"))
+            if not state.is_live and started_at:
+                # Streams already running when we first saw them say nothing
+                # about how fast the scheduler reacts
+                if previously_polled and started_at.timestamp() <= now:
+                    self.detection_latencies[state.tier].append(
+                        now - started_at.timestamp())
+                state.start_hours[self.hour_of_week(started_at)] += 1
+            state.is_live = True
+            state.viewer_count = stream_data.get("viewer_count", 0) or 0
+            state.last_live_at = now
+        else:
+            state.is_live = False
+
+        state.tier = self.classify(state, now)
+        interval = self.intervals[state.tier]
+        if name in self.covered:
+            interval = max(interval, self.reconcile_interval)
+        state.next_due = now + interval
+
+    def classify(self, state, now):
+        if state.is_live or state.viewer_count >= self.hot_viewer_threshold:
+            return HOT
+        if self.in_start_window(state, now):
+            return HOT
+        if state.last_live_at and now - state.last_live_at <= self.recent_live_seconds:
+            return WARM
+        return COLD
+
+    def in_start_window(self, state, now):
+        if not state.start_hours:
+            return False
+        hour = self.hour_of_week(
+            datetime.datetime.fromtimestamp(now, datetime.timezone.utc))
+        return any(
+            state.start_hours[(hour + offset) % 168] for offset in (-1, 0, 1))
+
+    def set_covered(self, names, reconcile_interval):
+        """Streamers covered by EventSub only need an occasional reconciliation poll."""
+        names = set(names)
+        for name in self.covered - names:
+            state = self.states.get(name)
+            if state is not None and state.last_polled is not None:
+                state.next_due = min(
+                    state.next_due, state.last_polled + self.intervals[state.tier])
+        self.covered = names
+        self.reconcile_interval = reconcile_interval
+
+    def add_start_hours(self, name, hour_of_week, starts=1):
+        state = self.states.get(name)
+        if state is not None:
+            state.start_hours[hour_of_week] += starts
+
+    def get_stats(self):
+        elapsed_minutes = max((time.time() - self.started) / 60, 1 / 60)
+        tier_counts = Counter(state.tier for state in self.states.values())
+        stats = {}
+        for tier, interval in self.intervals.items():
+            gaps = self.poll_gaps[tier]
+            latencies = sorted(self.detection_latencies[tier])
+            stats[tier] = {
+                "streamers": tier_counts[tier],
+                "target_interval": interval,
+                "avg_interval": sum(gaps) / len(gaps) if gaps else None,
+                "polls_per_minute": self.polls[tier] / elapsed_minutes,
+                "detections": len(latencies),
+                "avg_detection_latency":
+                    sum(latencies) / len(latencies) if latencies else None,
+                "p95_detection_latency":
+                    latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+                    if latencies else None,
+            }
+        return stats
+
+    def get_report(self):
+        lines = []
+        for tier, tier_stats in self.get_stats().items():
+            interval = tier_stats["avg_interval"] or tier_stats["target_interval"]
+            line = f"{tier}: {tier_stats['streamers']} streamers, every {interval:.0f}s"
+            if tier_stats["avg_detection_latency"] is not None:
+                line += (
+                    f", detection {tier_stats['avg_detection_latency']:.1f}s avg / "
+                    f"{tier_stats['p95_detection_latency']:.1f}s p95"
+                )
+            lines.append(line)
+        return "\n".join(lines)
+
+    @staticmethod
+    def parse_started_at(started_at):
+        if not started_at:
+            return None
+        try:
+            return datetime.datetime.fromisoformat(started_at.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def hour_of_week(moment):
+        moment = moment.astimezone(datetime.timezone.utc)
+        return moment.weekday() * 24 + moment.hour
@@ -0,0 +1,73 @@
+class PrefixCache:
+    """
+    In-memory guild prefix lookup for the command prefix resolver.
+
+    Every message the bot sees needs its guild's prefix, so prefixes are
+    read from the database once and served from memory afterwards. The
+    guild writes (change_guild_prefix, create_new_guild_template,
+    remove_guild) go through this class, which writes to the database
+    first and then drops the cached entry.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.prefixes = {}
+        self.default_prefix = None
+        self.invalidations = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get_default(self):
+        if self.default_prefix is not None:
+            self.hits += 1
+            return self.default_prefix
+        self.misses += 1
+        self.default_prefix = await self.db.get_prefix()
+        return self.default_prefix
+
+    async def get(self, guild_id):
+        """Return the guild's own prefix, or "" if it has none."""
+        guild_id = str(guild_id)
+        prefix = self.prefixes.get(guild_id)
+        if prefix is not None:
+            self.hits += 1
+            return prefix
+        self.misses += 1
+        invalidations = self.invalidations
+        prefix = await self.db.get_guild_prefix(guild_id)
+        # A write that landed while this read was in flight wins
+        if invalidations == self.invalidations:
+            self.prefixes[guild_id] = prefix
+        return prefix
+
+    async def resolve(self, guild_id=None):
+        if guild_id is not None:
+            prefix = await self.get(guild_id)
+            if prefix:
+                return prefix
+        return await self.get_default()
+
+    def invalidate(self, guild_id):
+        self.invalidations += 1
+        self.prefixes.pop(str(guild_id), None)
+
+    async def change_guild_prefix(self, guild_id, new_prefix):
+        await self.db.change_guild_prefix(guild_id, new_prefix)
+        self.invalidate(guild_id)
+
+    async def create_new_guild_template(self, guild_id, guild_name):
+        await self.db.create_new_guild_template(guild_id, guild_name)
+        self.invalidate(guild_id)
+
+    async def remove_guild(self, guild_id):
+        await self.db.remove_guild(guild_id)
+        self.invalidate(guild_id)
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "guilds": len(self.prefixes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,135 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+import aiohttp
+
+PRIORITY_LIVE = 0
+PRIORITY_COMMAND = 1
+PRIORITY_CACHE = 2
+
+
+class HelixRateLimiter:
+    """
+    Token bucket that every Helix request goes through.
+
+    The bucket starts at Twitch's default app limit and is corrected from the
+    Ratelimit-Limit / Ratelimit-Remaining / Ratelimit-Reset headers of every
+    response. When it runs dry, callers queue and are released in priority
+    order (live detection first, then command lookups, then cache refreshes).
+    A 429 empties the bucket until the reset time and the request is retried.
+    """
+
+    def __init__(self, session, bucket_size=800, refill_seconds=60, max_retries=3):
+        self.session = session
+        self.capacity = bucket_size
+        self.refill_seconds = refill_seconds
+        self.max_retries = max_retries
+        self.tokens = float(bucket_size)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.requests_sent = 0
+        self.rate_limited = 0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._dispatcher = None
+
+    @property
+    def refill_rate(self):
+        return self.capacity / self.refill_seconds
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+
+    def _seconds_until_token(self):
+        now = time.monotonic()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        return max((1 - self.tokens) / self.refill_rate, 0.01)
+
+    async def acquire(self, priority=PRIORITY_COMMAND):
+        self._refill()
+        if not self._waiters and self.tokens >= 1 and time.monotonic() >= self.blocked_until:
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        while self._waiters:
+            self._refill()
+            if self.tokens < 1 or time.monotonic() < self.blocked_until:
+                await asyncio.sleep(self._seconds_until_token())
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+
+    def update_from_headers(self, headers):
+        try:
+            limit = headers.get("Ratelimit-Limit")
+            remaining = headers.get("Ratelimit-Remaining")
+            reset = headers.get("Ratelimit-Reset")
+            if limit is not None:
+                self.capacity = max(int(limit), 1)
+            if remaining is not None:
+                self._refill()
+                self.tokens = min(float(remaining), self.tokens)
+            if reset is not None and remaining is not None and int(remaining) == 0:
+                self.blocked_until = time.monotonic() + max(int(reset) - time.time(), 0)
+        except ValueError:
+            pass
+
+    async def request(self, method, url, priority=PRIORITY_COMMAND, **kwargs):
+        """
+        Send a Helix request once the bucket allows it.
+
+        Returns:
+            tuple: (status, json body or None)
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(priority)
+            self.requests_sent += 1
+            async with self.session.request(method, url, **kwargs) as response:
+                self.update_from_headers(response.headers)
+                if response.status == 429:
+                    self.rate_limited += 1
+                    self.tokens = 0
+                    if self.blocked_until <= time.monotonic():
+                        self.blocked_until = time.monotonic() + 1
+                    if attempt < self.max_retries:
+                        continue
+                try:
+                    data = await response.json(content_type=None)
+                except (aiohttp.ContentTypeError, ValueError):
+                    data = None
+                return response.status, data
+
+    async def get(self, url, priority=PRIORITY_COMMAND, **kwargs):
+        return await self.request("GET", url, priority, **kwargs)
+
+    async def post(self, url, priority=PRIORITY_COMMAND, **kwargs):
+        return await self.request("POST", url, priority, **kwargs)
+
+    async def delete(self, url, priority=PRIORITY_COMMAND, **kwargs):
+        return await self.request("DELETE", url, priority, **kwargs)
+
+    def get_stats(self):
+        self._refill()
+        return {
+            "capacity": self.capacity,
+            "tokens": int(self.tokens),
+            "queued": len(self._waiters),
+            "requests": self.requests_sent,
+            "rate_limited": self.rate_limited,
+        }
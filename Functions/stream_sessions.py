@@ -0,0 +1,74 @@
+import time
+
+from Functions.notifications import live_stream_id
+from Functions.poll_scheduler import PollScheduler
+
+
+class StreamSessionRecorder:
+    """
+    Collects go-live/go-offline observations and writes them as stream
+    sessions once per poll cycle.
+
+    A live streamer is seen on every poll, so observations are merged in
+    memory (one row per stream, keeping the peak viewer count) and `flush`
+    writes the whole cycle in one transaction. Only streamers with an open
+    session are tracked for offline transitions, so the many offline
+    streamers in a cycle cost nothing.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.live = {}
+        self.pending = {}
+        self.ended = {}
+        self.flushes = 0
+        self.sessions_written = 0
+
+    async def load(self):
+        """Pick up sessions left open by the previous run so they get closed."""
+        for streamer in await self.db.get_open_stream_sessions():
+            self.live[streamer] = None
+
+    def observe(self, streamer_name, stream_data, now=None):
+        now = now or time.time()
+        if stream_data:
+            started_at = PollScheduler.parse_started_at(stream_data.get("started_at"))
+            started_at = started_at.timestamp() if started_at else now
+            stream_id = live_stream_id(stream_data)
+            viewers = stream_data.get("viewer_count", 0) or 0
+            session = self.pending.get((streamer_name, stream_id))
+            if session is None:
+                self.pending[(streamer_name, stream_id)] = [
+                    streamer_name, stream_id, started_at, None, viewers, stream_data.get("game_name")]
+            else:
+                session[3] = None
+                session[4] = max(session[4], viewers)
+                session[5] = stream_data.get("game_name") or session[5]
+            self.live[streamer_name] = stream_id
+        elif streamer_name in self.live:
+            del self.live[streamer_name]
+            self.ended[streamer_name] = now
+            for (name, _), session in self.pending.items():
+                if name == streamer_name:
+                    session[3] = now
+
+    async def flush(self):
+        if not self.pending and not self.ended:
+            return 0
+        pending, self.pending = self.pending, {}
+        ended, self.ended = self.ended, {}
+        await self.db.save_stream_sessions(
+            [tuple(session) for session in pending.values()],
+            [(ended_at, streamer) for streamer, ended_at in ended.items()],
+        )
+        self.flushes += 1
+        self.sessions_written += len(pending)
+        return len(pending)
+
+    def get_stats(self):
+        return {
+            "live": len(self.live),
+            "pending": len(self.pending),
+            "flushes": self.flushes,
+            "sessions_written": self.sessions_written,
+        }
@@ -0,0 +1,138 @@
+import time
+from collections import OrderedDict
+
+import Functions.others
+from Functions.rate_limiter import PRIORITY_COMMAND, PRIORITY_CACHE
+
+USERS_URL = "https://api.twitch.tv/helix/users"
+
+
+class StreamerMetadataCache:
+    """
+    Twitch user objects (id, display name, profile picture) keyed by login.
+
+    Rows live in the `streamers` table with the time they were fetched, so
+    a restart starts warm instead of asking Helix about every watched
+    streamer again. A size-capped LRU sits on top for the hot lookups.
+    Lookups serve whatever is stored, even if it is past `ttl`, and only go
+    to Helix for logins that were never seen; `refresh_expired` renews old
+    rows in the background, 100 logins per request. Logins Helix does not
+    know (renamed, banned or deleted) are stored as "not found" rows, so
+    they are asked about again only once per `ttl` as well.
+    """
+
+    def __init__(self, db, helix, headers, ttl=86400, max_entries=5000, batch_size=100):
+        self.db = db
+        self.helix = helix
+        self.headers = headers
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.fetched = 0
+        self.refreshed = 0
+        self.not_found = 0
+
+    def remember(self, login, user, fetched_at):
+        self.entries[login] = (user, fetched_at)
+        self.entries.move_to_end(login)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def fetch(self, logins, priority):
+        """Look `logins` up on Helix, store what was found and return it."""
+        found = {}
+        answered = []
+        for batch in Functions.others.chunk_list(logins, self.batch_size):
+            status, data = await self.helix.get(
+                USERS_URL, priority, headers=self.headers,
+                params=[("login", login) for login in batch])
+            if status != 200 or not data:
+                continue
+            answered.extend(batch)
+            for user in data.get("data", []):
+                found[user["login"].lower()] = user
+        # Only a successful answer proves a login does not exist
+        not_found = [login for login in answered if login not in found]
+        fetched_at = time.time()
+        if found:
+            await self.db.save_streamer_metadata(list(found.values()), fetched_at)
+            for login, user in found.items():
+                self.remember(login, user, fetched_at)
+            self.fetched += len(found)
+        if not_found:
+            await self.db.save_missing_streamers(not_found, fetched_at)
+            for login in not_found:
+                self.remember(login, None, fetched_at)
+            self.not_found += len(not_found)
+        return found
+
+    def is_known_missing(self, user, fetched_at, now):
+        return user is None and now - fetched_at < self.ttl
+
+    async def get_many(self, logins, priority=PRIORITY_COMMAND):
+        """
+        Return {login: Helix user object} for every login that exists on Twitch.
+        """
+        logins = list(dict.fromkeys(login.strip().lower() for login in logins))
+        now = time.time()
+        result = {}
+        missing = []
+        for login in logins:
+            entry = self.entries.get(login)
+            if entry is None or (entry[0] is None and not self.is_known_missing(*entry, now)):
+                missing.append(login)
+            else:
+                self.entries.move_to_end(login)
+                if entry[0] is not None:
+                    result[login] = entry[0]
+                self.hits += 1
+
+        if missing:
+            stored = await self.db.get_streamer_metadata(missing)
+            answered = set()
+            for login, (user, fetched_at) in stored.items():
+                if user is None and not self.is_known_missing(user, fetched_at, now):
+                    continue  # an expired "not found", ask Helix again
+                self.remember(login, user, fetched_at)
+                answered.add(login)
+                if user is not None:
+                    result[login] = user
+            self.db_hits += len(answered)
+            missing = [login for login in missing if login not in answered]
+
+        if missing:
+            result.update(await self.fetch(missing, priority))
+        return result
+
+    async def get(self, login, priority=PRIORITY_COMMAND):
+        return (await self.get_many([login], priority)).get(login.strip().lower())
+
+    async def refresh_expired(self, limit=1000):
+        """Refetch watched streamers whose metadata is missing or older than `ttl`."""
+        stale = await self.db.get_stale_streamers(time.time() - self.ttl, limit)
+        if not stale:
+            return 0
+        refreshed = len(await self.fetch(stale, PRIORITY_CACHE))
+        self.refreshed += refreshed
+        return refreshed
+
+    @staticmethod
+    def profile_picture(user, size=300):
+        url = user.get("profile_image_url") if user else None
+        if url:
+            url = url.replace("{width}", str(size)).replace("{height}", str(size))
+        return url
+
+    def get_stats(self):
+        return {
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "fetched": self.fetched,
+            "refreshed": self.refreshed,
+            "not_found": self.not_found,
+        }
@@ -0,0 +1,198 @@
+import bisect
+import json
+import os
+import struct
+
+# One index entry: record timestamp (float64) and byte offset (uint64)
+INDEX_ENTRY = struct.Struct("<dQ")
+
+
+def index_path(segment):
+    return segment + ".idx"
+
+
+class JsonLinesSink:
+    """
+    Structured event log: one JSON object per line.
+
+    Every `index_every` records the timestamp and byte offset of the record
+    are appended to a sidecar `.idx` file of fixed-size entries, so readers
+    can seek to a point in time or to the last few blocks without scanning
+    the log. The file rotates into numbered segments (`events.jsonl.1`, ...)
+    with their index at `max_bytes`, keeping `backups` old segments.
+
+    Only the LogWriter thread writes to a sink.
+    """
+
+    def __init__(self, path, index_every=100, max_bytes=10 * 1024 * 1024, backups=3):
+        self.path = path
+        self.index_every = index_every
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.handle = None
+        self.index_handle = None
+        self.size = 0
+        # Index the first record written after (re)opening the file
+        self.since_index = index_every
+        self.records = 0
+
+    def open(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.handle = open(self.path, "ab")
+        self.index_handle = open(index_path(self.path), "ab")
+        self.size = self.handle.seek(0, os.SEEK_END)
+
+    def write_records(self, records):
+        if self.handle is None:
+            self.open()
+        data = []
+        index = []
+        for record in records:
+            line = json.dumps(record, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+            if self.size and self.size + len(line) > self.max_bytes:
+                self.write_out(data, index)
+                data, index = [], []
+                self.rotate()
+                self.open()
+            if self.since_index >= self.index_every:
+                index.append(INDEX_ENTRY.pack(record["ts"], self.size))
+                self.since_index = 0
+            data.append(line)
+            self.size += len(line)
+            self.since_index += 1
+            self.records += 1
+        self.write_out(data, index)
+
+    def write_out(self, data, index):
+        # Data first, so an index entry never points past the end of the log
+        self.handle.write(b"".join(data))
+        self.handle.flush()
+        if index:
+            self.index_handle.write(b"".join(index))
+            self.index_handle.flush()
+
+    def rotate(self):
+        self.close()
+        for number in range(self.backups, 0, -1):
+            segment = f"{self.path}.{number}"
+            older = f"{self.path}.{number + 1}"
+            for source, target in ((segment, older), (index_path(segment), index_path(older))):
+                if not os.path.exists(source):
+                    continue
+                if number == self.backups:
+                    os.remove(source)
+                else:
+                    os.replace(source, target)
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+            os.replace(index_path(self.path), index_path(f"{self.path}.1"))
+        else:
+            os.remove(self.path)
+            os.remove(index_path(self.path))
+        self.since_index = self.index_every
+
+    def close(self):
+        for handle in (self.handle, self.index_handle):
+            if handle is not None:
+                handle.close()
+        self.handle = self.index_handle = None
+
+
+class StructuredLogReader:
+    """
+    Queries over a JsonLinesSink's files, for the UI and owner commands.
+
+    Filters are record fields, e.g. `event="notification_failed",
+    streamer="somebody"`. Results are always in chronological order.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def segments(self):
+        """Existing segment files, oldest first."""
+        segments = []
+        number = 1
+        while os.path.exists(f"{self.path}.{number}"):
+            segments.append(f"{self.path}.{number}")
+            number += 1
+        segments.reverse()
+        if os.path.exists(self.path):
+            segments.append(self.path)
+        return segments
+
+    @staticmethod
+    def read_index(segment):
+        try:
+            with open(index_path(segment), "rb") as index_file:
+                data = index_file.read()
+        except FileNotFoundError:
+            return []
+        data = data[:len(data) - len(data) % INDEX_ENTRY.size]
+        return list(INDEX_ENTRY.iter_unpack(data))
+
+    @staticmethod
+    def read_block(segment, start, end=None):
+        with open(segment, "rb") as log_file:
+            log_file.seek(start)
+            data = log_file.read() if end is None else log_file.read(end - start)
+        for line in data.splitlines():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A line still being written
+                continue
+
+    @staticmethod
+    def matches(record, filters):
+        return all(record.get(field) == value for field, value in filters.items())
+
+    def range(self, start=None, end=None, limit=None, **filters):
+        """Records with start <= ts <= end, oldest first, at most `limit` of them."""
+        results = []
+        segments = self.segments()
+        indexes = [self.read_index(segment) for segment in segments]
+        for position, (segment, index) in enumerate(zip(segments, indexes)):
+            if end is not None and index and index[0][0] > end:
+                break
+            following = indexes[position + 1] if position + 1 < len(indexes) else None
+            if start is not None and following and following[0][0] <= start:
+                continue  # the whole segment is older than start
+            offset = 0
+            if start is not None and index:
+                position_in_index = bisect.bisect_right([entry[0] for entry in index], start) - 1
+                if position_in_index >= 0:
+                    offset = index[position_in_index][1]
+            for record in self.read_block(segment, offset):
+                ts = record.get("ts", 0)
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts > end:
+                    return results
+                if self.matches(record, filters):
+                    results.append(record)
+                    if limit is not None and len(results) >= limit:
+                        return results
+        return results
+
+    def tail(self, count, start=None, **filters):
+        """The last `count` matching records with ts >= start, reading index blocks backwards."""
+        found = []
+        for segment in reversed(self.segments()):
+            offsets = sorted({0, *(offset for _, offset in self.read_index(segment))})
+            bounds = list(zip(offsets, offsets[1:] + [None]))
+            for block_start, block_end in reversed(bounds):
+                records = list(self.read_block(segment, block_start, block_end))
+                block = [
+                    record for record in records
+                    if self.matches(record, filters)
+                    and (start is None or record.get("ts", 0) >= start)
+                ]
+                found = block + found
+                if len(found) >= count:
+                    return found[-count:]
+                if start is not None and records and records[0].get("ts", 0) < start:
+                    return found
+        return found
@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+
+class SubscriptionIndex:
+    """
+    In-memory streamer -> subscriber ids index.
+
+    Built once from the database on startup and kept current by the
+    watch/unwatch/unregister commands, so a live event only touches the
+    users who actually watch that streamer.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.watchlists = defaultdict(set)
+
+    @staticmethod
+    def normalize(streamer):
+        return streamer.strip().lower()
+
+    def build(self, user_ids_with_streamers):
+        self.subscribers.clear()
+        self.watchlists.clear()
+        for user_id, streamers in user_ids_with_streamers.items():
+            for streamer in streamers:
+                if streamer and streamer.strip():
+                    self.add(user_id, streamer)
+
+    def build_from_pairs(self, pairs):
+        """Build from an iterable of (user_id, streamer), such as SQLiteHandler.iter_subscriptions()."""
+        self.subscribers.clear()
+        self.watchlists.clear()
+        for user_id, streamer in pairs:
+            if streamer and streamer.strip():
+                self.add(user_id, streamer)
+
+    def add(self, user_id, streamer):
+        user_id = str(user_id)
+        streamer = self.normalize(streamer)
+        self.subscribers[streamer].add(user_id)
+        self.watchlists[user_id].add(streamer)
+
+    def remove(self, user_id, streamer):
+        user_id = str(user_id)
+        streamer = self.normalize(streamer)
+        subscribers = self.subscribers.get(streamer)
+        if subscribers is not None:
+            subscribers.discard(user_id)
+            if not subscribers:
+                del self.subscribers[streamer]
+        watchlist = self.watchlists.get(user_id)
+        if watchlist is not None:
+            watchlist.discard(streamer)
+            if not watchlist:
+                del self.watchlists[user_id]
+
+    def remove_user(self, user_id):
+        user_id = str(user_id)
+        for streamer in list(self.watchlists.get(user_id, ())):
+            self.remove(user_id, streamer)
+
+    def get_subscribers(self, streamer):
+        """Return a snapshot, so commands can mutate the index during a fan-out."""
+        return frozenset(self.subscribers.get(self.normalize(streamer), ()))
+
+    def get_streamers(self):
+        return list(self.subscribers)
+
+    def __len__(self):
+        return sum(len(subscribers) for subscribers in self.subscribers.values())
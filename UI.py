@@ -33,7 +33,7 @@ class MyApp(customtkinter.CTk):
         self.cwd = os.getcwd()
         self.chj = Json_config_hanldler.JsonConfigHandler(
             os.path.join(self.cwd, "UI\\config.json"))
-        self.ch = Sql_handler.SQLiteHandler("data.db")
+        self.ch = Sql_handler.SQLiteHandler()
         self.config_window()
 
         self.load_ui()
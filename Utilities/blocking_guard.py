@@ -0,0 +1,66 @@
+import asyncio
+import functools
+import os
+import socket
+import traceback
+
+import requests
+from colorama import Fore
+
+import Functions.others
+
+violations = 0
+_installed = False
+
+
+def on_loop_thread():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def report(call_name):
+    global violations
+    violations += 1
+    stack = traceback.extract_stack()[:-2]
+    project_frames = [
+        frame for frame in stack
+        if frame.filename.startswith(os.getcwd()) and frame.filename != __file__
+    ]
+    caller = project_frames[-1] if project_frames else stack[-1]
+    Functions.others.log_print(
+        f"{Functions.others.get_timestamp()} {Fore.LIGHTMAGENTA_EX}[BLOCKING] "
+        f"{Fore.LIGHTBLUE_EX}{call_name}{Fore.RESET} called on the event loop thread from "
+        f"{Fore.LIGHTYELLOW_EX}{caller.filename}:{caller.lineno}{Fore.RESET}",
+        log_file_name="Performance_debug.txt",
+        show_message=False,
+    )
+
+
+def guard(func, call_name):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if on_loop_thread():
+            report(call_name)
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def install():
+    """
+    Debug-mode guard: log every synchronous network call (requests, or
+    anything going through socket.create_connection such as urllib and
+    http.client) made from the thread running the asyncio event loop.
+    aiohttp uses non-blocking sockets and is not affected.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    requests.Session.request = guard(
+        requests.Session.request, "requests.Session.request")
+    socket.create_connection = guard(
+        socket.create_connection, "socket.create_connection")
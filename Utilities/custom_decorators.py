@@ -9,7 +9,6 @@ import os
 cwd = os.getcwd()
 chj = Json_config_hanldler.JsonConfigHandler(
     os.path.join(cwd, "UI\\config.json"))
-debug = chj.get_debug()
 
 
 def performance_tracker(func):
@@ -25,7 +24,7 @@ def performance_tracker(func):
         memory_diff = max(memory_after - memory_before,
                           0)  # Ensure non-negative
 
-        if debug:
+        if chj.get_debug():
             args_str = f"{Fore.CYAN}Arguments: {args}, Keyword Arguments: {kwargs}{Fore.RESET}"
             memory_info = f"{Fore.MAGENTA}Memory Used: {memory_diff / (1024 * 1024):.2f} MB{Fore.RESET}"
             thread_info = f"{Fore.GREEN}Thread ID: {threading.current_thread().ident}{Fore.RESET}"
@@ -0,0 +1,156 @@
+"""
+Local stand-in for the Twitch EventSub WebSocket server and the Helix
+subscriptions endpoint, so the EventSub transport can be exercised offline.
+
+    python Utilities/mock_eventsub_server.py --port 8080
+
+then start the bot with
+    eventsub_ws_url=ws://127.0.0.1:8080/ws
+    eventsub_subscriptions_url=http://127.0.0.1:8080/eventsub/subscriptions
+
+Trigger events with
+    POST /trigger    {"type": "stream.online", "broadcaster_user_id": "1", "broadcaster_user_login": "name"}
+    POST /reconnect  (sends session_reconnect to every open socket)
+    POST /drop       (closes every open socket without warning)
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import uuid
+
+from aiohttp import web, WSMsgType
+
+
+class MockEventSubServer:
+    def __init__(self, keepalive_timeout=10):
+        self.keepalive_timeout = keepalive_timeout
+        self.sockets = {}  # websocket -> session id
+        self.subscriptions = {}  # subscription id -> subscription
+        self.reconnecting = set()  # session ids allowed to move to a new socket
+        self._ids = itertools.count(1)
+        self.app = web.Application()
+        self.app.router.add_get("/ws", self.websocket)
+        self.app.router.add_post("/eventsub/subscriptions", self.create_subscription)
+        self.app.router.add_delete("/eventsub/subscriptions", self.delete_subscription)
+        self.app.router.add_get("/eventsub/subscriptions", self.list_subscriptions)
+        self.app.router.add_post("/trigger", self.trigger)
+        self.app.router.add_post("/reconnect", self.reconnect)
+        self.app.router.add_post("/drop", self.drop)
+
+    @staticmethod
+    def message(message_type, payload, subscription_type=None):
+        metadata = {
+            "message_id": str(uuid.uuid4()),
+            "message_type": message_type,
+            "message_timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        if subscription_type:
+            metadata["subscription_type"] = subscription_type
+            metadata["subscription_version"] = "1"
+        return {"metadata": metadata, "payload": payload}
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session_id = request.query.get("session_id") or str(uuid.uuid4())
+        self.reconnecting.discard(session_id)
+        self.sockets[ws] = session_id
+        await ws.send_json(self.message("session_welcome", {"session": {
+            "id": session_id,
+            "status": "connected",
+            "keepalive_timeout_seconds": self.keepalive_timeout,
+            "reconnect_url": None,
+        }}))
+
+        async def keepalive():
+            while not ws.closed:
+                await asyncio.sleep(self.keepalive_timeout / 2)
+                if not ws.closed:
+                    await ws.send_json(self.message("session_keepalive", {}))
+
+        keepalive_task = asyncio.create_task(keepalive())
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            keepalive_task.cancel()
+            self.sockets.pop(ws, None)
+            if (session_id not in self.sockets.values()
+                    and session_id not in self.reconnecting):
+                self.subscriptions = {
+                    key: value for key, value in self.subscriptions.items()
+                    if value["transport"]["session_id"] != session_id
+                }
+        return ws
+
+    async def create_subscription(self, request):
+        body = await request.json()
+        session_id = body["transport"]["session_id"]
+        if session_id not in self.sockets.values():
+            return web.json_response({"error": "Bad Request", "status": 400}, status=400)
+        subscription = {
+            "id": str(next(self._ids)),
+            "status": "enabled",
+            "type": body["type"],
+            "version": body["version"],
+            "condition": body["condition"],
+            "transport": body["transport"],
+        }
+        self.subscriptions[subscription["id"]] = subscription
+        return web.json_response({"data": [subscription]}, status=202)
+
+    async def delete_subscription(self, request):
+        self.subscriptions.pop(request.query.get("id"), None)
+        return web.Response(status=204)
+
+    async def list_subscriptions(self, request):
+        return web.json_response({"data": list(self.subscriptions.values())})
+
+    async def trigger(self, request):
+        event = await request.json()
+        subscription_type = event.pop("type")
+        delivered = 0
+        for subscription in list(self.subscriptions.values()):
+            if (subscription["type"] != subscription_type
+                    or subscription["condition"]["broadcaster_user_id"]
+                    != event["broadcaster_user_id"]):
+                continue
+            for ws, session_id in list(self.sockets.items()):
+                if session_id == subscription["transport"]["session_id"]:
+                    await ws.send_json(self.message(
+                        "notification",
+                        {"subscription": subscription, "event": event},
+                        subscription_type,
+                    ))
+                    delivered += 1
+        return web.json_response({"delivered": delivered})
+
+    async def reconnect(self, request):
+        host = f"ws://{request.host}/ws"
+        for ws, session_id in list(self.sockets.items()):
+            self.reconnecting.add(session_id)
+            await ws.send_json(self.message("session_reconnect", {"session": {
+                "id": session_id,
+                "status": "reconnecting",
+                "reconnect_url": f"{host}?session_id={session_id}",
+            }}))
+        return web.json_response({"sessions": len(self.sockets)})
+
+    async def drop(self, request):
+        for ws in list(self.sockets):
+            await ws.close()
+        return web.json_response({"dropped": True})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Twitch EventSub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    web.run_app(MockEventSubServer().app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
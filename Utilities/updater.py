@@ -3,19 +3,16 @@ import os
 import shutil
 from zipfile import ZipFile
 from colorama import Fore, Style
-import Functions.Sql_handler
 import Functions.others
 from Functions.Json_config_hanldler import JsonConfigHandler
 from urllib3.exceptions import MaxRetryError
 
-ch = Functions.Sql_handler.SQLiteHandler()
 cwd = os.getcwd()
 chj = JsonConfigHandler(os.path.join(cwd, "UI\\config.json"))
 
 
-def search_for_updates(autoupdate=False):
+def search_for_updates(current_version, autoupdate=False):
     try:
-        current_version = ch.get_version()
         online_version = Functions.others.get_version()
         Functions.others.set_console_title("Checking For Updates. . .")
         if online_version != current_version:
@@ -38,7 +35,6 @@ def search_for_updates(autoupdate=False):
                 cwd = os.getcwd() + "\\TwitchDiscordNotifications-main"
                 shutil.copytree(cwd, os.getcwd(), dirs_exist_ok=True)
                 shutil.rmtree(cwd)
-                ch.set_version(online_version)
                 chj.set_version(online_version)
                 Functions.others.clear_console()
                 Functions.others.set_console_title(
@@ -2,7 +2,6 @@ import asyncio
 from discord.ext import commands
 import discord
 import datetime
-import Functions.others
 
 
 class Clear(commands.Cog):
@@ -17,9 +16,7 @@ class Clear(commands.Cog):
     )
     @commands.cooldown(rate=1, per=60, type=commands.BucketType.user)
     async def clear_bot_messages(self, ctx) -> None:
-        variables = Functions.others.unpickle_variable()
-
-        VERSION = variables["version"]
+        VERSION = self.bot.state.version
         messages_to_remove = 1000
         user = await self.bot.fetch_user(ctx.author.id)
 
@@ -1,13 +1,11 @@
 from discord.ext import commands
 import discord
-from Functions.Sql_handler import SQLiteHandler
-
-ch = SQLiteHandler()
 
 
 class Configs(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db):
         self.bot = bot
+        self.db = db
 
     '''Configrole command'''
     @commands.command(
@@ -24,7 +22,7 @@ class Configs(commands.Cog):
             return
         guild_id = ctx.guild.id
         role_id = role.id
-        ch.change_role_to_add(guild_id, role_id)
+        await self.db.change_role_to_add(guild_id, role_id)
         await ctx.send(
             f"The role to add has been updated to {role.mention} in the server configuration."
         )
@@ -39,7 +37,7 @@ class Configs(commands.Cog):
     async def change_guild_prefix(self, ctx, new_prefix: str):
         if ctx.author.guild_permissions.administrator:
             guild_id = ctx.guild.id
-            ch.change_guild_prefix(guild_id, new_prefix)
+            await self.bot.prefixes.change_guild_prefix(guild_id, new_prefix)
             await ctx.send(f"Prefix for this guild has been updated to `{new_prefix}`.")
         else:
             await ctx.send(
@@ -48,4 +46,4 @@ class Configs(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(Configs(bot))
+    await bot.add_cog(Configs(bot, bot.db))
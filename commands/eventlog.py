@@ -0,0 +1,69 @@
+from discord.ext import commands
+import Functions.others
+import discord
+import asyncio
+import datetime
+import time
+
+MAX_EVENTS = 15
+
+
+class EventLog(commands.Cog):
+    def __init__(self, bot, db):
+        self.bot = bot
+        self.db = db
+        self.others = Functions.others
+
+    def format_event(self, record):
+        parts = [f"<t:{int(record['ts'])}:f>", f"`{record['event']}`"]
+        if record.get("streamer"):
+            parts.append(record["streamer"])
+        if record.get("user"):
+            parts.append(f"<@{record['user']}>")
+        if record.get("latency_ms") is not None:
+            parts.append(f"{record['latency_ms']:.0f} ms")
+        reason = record.get("reason") or record.get("message")
+        if reason:
+            parts.append(f"({reason[:80]})")
+        return " ".join(parts)
+
+    @commands.command(
+        name="eventlog",
+        aliases=["el"],
+        usage="eventlog [streamer|all] [event|all] [hours]",
+        help="Shows the latest structured log events, e.g. `eventlog somebody notification_failed 48`",
+    )
+    @commands.is_owner()
+    async def eventlog(self, ctx, streamer="all", event="all", hours: float = None):
+        filters = {}
+        if streamer != "all":
+            filters["streamer"] = self.others.parse_streamer_name(streamer)
+        if event != "all":
+            filters["event"] = event
+
+        reader = self.others.get_event_log_reader()
+        start = time.time() - hours * 3600 if hours is not None else None
+        records = await asyncio.to_thread(reader.tail, MAX_EVENTS, start, **filters)
+
+        if records:
+            description = "\n".join(self.format_event(record) for record in records)
+            color = 10242047
+        elif not self.others.chj.get_structured_logs():
+            description = "Structured logs are disabled. Set `structured_logs` to true in the config."
+            color = 16776960
+        else:
+            description = "No matching events."
+            color = 16776960
+
+        embed = discord.Embed(
+            title="Event Log",
+            description=description[:4096],
+            color=color,
+            timestamp=datetime.datetime.now()
+        )
+        embed.set_footer(text=f"{self.bot.state.version} | Made by Beelzebub2")
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(EventLog(bot, bot.db))
@@ -3,42 +3,38 @@ import traceback
 from discord.ext import commands
 import discord
 from colorama import Fore
-from Functions.Sql_handler import SQLiteHandler
 import Functions.others
 
 
-ch = SQLiteHandler()
-
-
 class Events(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db):
         self.bot = bot
+        self.db = db
 
     '''On Guild Join'''
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
         # TODO add embed and log_print
-        in_guild = ch.is_guild_in_config(guild.id)
+        in_guild = await self.db.is_guild_in_config(guild.id)
         if not in_guild:
-            ch.create_new_guild_template(guild.id, guild.name)
+            await self.bot.prefixes.create_new_guild_template(guild.id, guild.name)
 
     '''On Guild Remove'''
     @commands.Cog.listener()
     async def on_guild_remove(self, guild):
         # TODO add embed and log_print
-        in_guild = ch.is_guild_in_config(guild.id)
+        in_guild = await self.db.is_guild_in_config(guild.id)
         if in_guild:
-            ch.remove_guild(guild.id)
+            await self.bot.prefixes.remove_guild(guild.id)
 
     '''On Member Join'''
     @commands.Cog.listener()
     async def on_member_join(self, member):
-        variables = Functions.others.unpickle_variable()
-        console_width = variables["console_width"]
+        console_width = self.bot.state.console_width
 
         guild_id = member.guild.id
 
-        role_id = int(ch.get_role_to_add(guild_id))
+        role_id = int(await self.db.get_role_to_add(guild_id))
         general_channel = member.guild.text_channels[0]
 
         if not role_id:
@@ -115,7 +111,7 @@ class Events(commands.Cog):
             if isinstance(message.channel, discord.DMChannel):
                 embed = discord.Embed(
                     title=f"Hello, {message.author.display_name}!",
-                    description=f"My prefix is: `{ch.get_prefix()}`",
+                    description=f"My prefix is: `{await self.bot.prefixes.get_default()}`",
                     color=discord.Color.green(),
                     timestamp=datetime.datetime.now()
                 )
@@ -123,7 +119,7 @@ class Events(commands.Cog):
             elif isinstance(message.channel, discord.TextChannel):
                 guild_prefix = self.bot.command_prefix
                 if message.guild:
-                    guild_prefix = ch.get_guild_prefix(message.guild.id)
+                    guild_prefix = await self.bot.prefixes.get(message.guild.id)
 
                 embed = discord.Embed(
                     title=f"Hello, {message.author.display_name}!",
@@ -135,4 +131,4 @@ class Events(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(Events(bot))
+    await bot.add_cog(Events(bot, bot.db))
@@ -1,7 +1,6 @@
 from discord.ext import commands
 import discord
 import datetime
-import Functions.others
 
 
 class CommandNotFoundError(commands.CommandNotFound):
@@ -19,8 +18,7 @@ class Help(commands.Cog):
         help="Shows all available commands and their descriptions or provides specific command information if a command is provided.",
     )
     async def help(self, ctx, command=None):
-        variables = Functions.others.unpickle_variable()
-        VERSION = variables["version"]
+        VERSION = self.bot.state.version
 
         def get_command_info(cmd):
             description = cmd.help or "No description available."
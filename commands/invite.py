@@ -1,7 +1,6 @@
 from discord.ext import commands
 import discord
 import datetime
-import Functions.others
 
 
 
@@ -17,8 +16,7 @@ class Invite(commands.Cog):
         usage="invite",
     )
     async def invite(self, ctx):
-        variables = Functions.others.unpickle_variable()
-        VERSION = variables["version"]
+        VERSION = self.bot.state.version
         embed = discord.Embed(
             title="Invite Me!",
             description=f"[Click here](https://discord.com/api/oauth2/authorize?client_id={self.bot.user.id}&permissions=8&scope=bot)",
@@ -4,44 +4,14 @@ import discord
 from colorama import Fore
 
 import datetime
-from Functions.Sql_handler import SQLiteHandler
-ch = SQLiteHandler()
 
 
 class ListStreamers(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db):
         self.bot = bot
+        self.db = db
         self.others = Functions.others
 
-    async def fetch_streamer_data(self, session, streamer_name, pfps, names):
-        streamer_name = streamer_name.replace(" ", "")
-
-        if streamer_name in self.streamer_data_cache:
-            streamer_data = self.streamer_data_cache[streamer_name]
-            profile_picture_url = streamer_data.get("profile_image_url", "")
-            profile_picture_url = profile_picture_url.replace(
-                "{width}", "150").replace("{height}", "150")
-            pfps.append(profile_picture_url)
-            names.append(streamer_data["display_name"])
-        else:
-            url = f"https://api.twitch.tv/helix/users?login={streamer_name}"
-            async with session.get(url, headers=self.HEADERS) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if "data" in data and len(data["data"]) > 0:
-                        streamer_data = data["data"][0]
-                        profile_picture_url = streamer_data.get(
-                            "profile_image_url", "")
-                        profile_picture_url = profile_picture_url.replace(
-                            "{width}", "150").replace("{height}", "150")
-                        pfps.append(profile_picture_url)
-                        names.append(streamer_data["display_name"])
-                    else:
-                        self.others.log_print(
-                            f"{self.others.get_timestamp()} No data found for streamer: {streamer_name}",
-                            show_message=False
-                        )
-
     @commands.command(
         name="list",
         aliases=["l"],
@@ -50,14 +20,11 @@ class ListStreamers(commands.Cog):
     )
     async def list_streamers(self, ctx):
         user_id = str(ctx.author.id)
-        user_ids = ch.get_all_user_ids()
-        variables = self.others.unpickle_variable()
-        self.VERSION = variables["version"]
-        self.HEADERS = variables["headers"]
-        self.streamer_data_cache = variables["streamers_cache"]
+        user_ids = await self.db.get_existing_user_ids([user_id])
+        self.VERSION = self.bot.state.version
 
         if user_id in user_ids:
-            streamer_list = ch.get_streamers_for_user(user_id)
+            streamer_list = await self.db.get_streamers_for_user(user_id)
 
             if streamer_list:
                 streamer_names = ", ".join(streamer_list)
@@ -127,4 +94,4 @@ class ListStreamers(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(ListStreamers(bot))
+    await bot.add_cog(ListStreamers(bot, bot.db))
@@ -2,14 +2,12 @@ import os
 from discord.ext import commands
 import discord
 import datetime
-from Functions.Sql_handler import SQLiteHandler
-
-ch = SQLiteHandler()
 
 
 class Reload(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db):
         self.bot = bot
+        self.db = db
 
     @commands.command(name="reload", aliases=["r"], description="reloads cogs")
     @commands.is_owner()
@@ -29,7 +27,7 @@ class Reload(commands.Cog):
 
         bot_info = await self.bot.application_info()
         owner_id = str(bot_info.owner.id)
-        ch.save_bot_owner_id(owner_id)
+        await self.db.save_bot_owner_id(owner_id)
         owner = self.bot.get_user(int(owner_id))
         if threshold <= 0:
             title = "Error Reloading the commands"
@@ -59,4 +57,4 @@ class Reload(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(Reload(bot))
+    await bot.add_cog(Reload(bot, bot.db))
@@ -3,16 +3,13 @@ from discord.ext import commands
 import sys
 import os
 import discord
-from Functions.Sql_handler import SQLiteHandler
 import Functions.others
 
 
-ch = SQLiteHandler()
-
-
 class Restart(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db):
         self.bot = bot
+        self.db = db
 
     @commands.command(
         name="restart",
@@ -22,10 +19,8 @@ class Restart(commands.Cog):
     )
     @commands.is_owner()
     async def restart(self, ctx):
-        variables = Functions.others.unpickle_variable()
-        processed_streamers = variables["processed_streamers"]
-        data = {"Restarted": True, "Streamers": processed_streamers}
-        ch.save_to_temp_json(data)
+        data = {"Restarted": True, "Streamers": self.bot.state.processed_streamers}
+        await self.db.save_to_temp_json(data)
         embed = discord.Embed(
             title="Restarting",
             description="Bot is restarting...",
@@ -35,9 +30,10 @@ class Restart(commands.Cog):
         embed.set_thumbnail(url="https://i.imgur.com/TavP95o.png")
         await ctx.send(embed=embed)
 
+        Functions.others.flush_logs()
         python = sys.executable
         os.execl(python, python, *sys.argv)
 
 
 async def setup(bot):
-    await bot.add_cog(Restart(bot))
+    await bot.add_cog(Restart(bot, bot.db))
@@ -0,0 +1,97 @@
+from discord.ext import commands
+import Functions.others
+import discord
+from colorama import Fore
+
+import datetime
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class Schedule(commands.Cog):
+    def __init__(self, bot, db):
+        self.bot = bot
+        self.db = db
+        self.others = Functions.others
+
+    def next_occurrence(self, hour_of_week):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        week_start = (now - datetime.timedelta(days=now.weekday())).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        moment = week_start + datetime.timedelta(hours=hour_of_week)
+        if moment < now:
+            moment += datetime.timedelta(weeks=1)
+        return int(moment.timestamp())
+
+    def format_duration(self, seconds):
+        hours, minutes = divmod(int(seconds) // 60, 60)
+        return f"{hours}h {minutes:02d}m"
+
+    @commands.command(
+        name="when",
+        aliases=["schedule", "usually"],
+        usage="when <streamername_or_link>",
+        help="Shows when a streamer usually goes live, based on the streams the bot has seen",
+    )
+    async def when(self, ctx, streamer_name_or_link):
+        self.VERSION = self.bot.state.version
+        streamer_name = self.others.parse_streamer_name(streamer_name_or_link)
+
+        hour_counts = await self.db.get_start_hour_counts(streamer_name)
+        summary = await self.db.get_stream_session_summary(streamer_name)
+
+        self.others.log_print(
+            Fore.CYAN
+            + self.others.get_timestamp()
+            + Fore.RESET
+            + self.others.holders(3)
+            + f"{Fore.CYAN + ctx.author.name + Fore.RESET} requested the schedule of "
+            + f"{Fore.CYAN + streamer_name + Fore.RESET}",
+            show_message=False
+        )
+
+        if not hour_counts:
+            embed = discord.Embed(
+                title=f"No stream history for {streamer_name}",
+                description="The bot has not seen this streamer go live yet. "
+                            "Streams are only recorded for streamers someone is watching.",
+                color=16776960,
+                timestamp=datetime.datetime.now()
+            )
+            embed.set_footer(text=f"{self.VERSION} | Made by Beelzebub2")
+            await ctx.send(embed=embed)
+            return
+
+        total_starts = sum(starts for _, _, starts in hour_counts)
+        top_hours = sorted(hour_counts, key=lambda row: row[2], reverse=True)[:3]
+        usual_times = "\n".join(
+            f"{DAYS[hour_of_week // 24]} {hour_of_week % 24:02d}:00 UTC "
+            f"({starts / total_starts:.0%} of streams), next <t:{self.next_occurrence(hour_of_week)}:R>"
+            for _, hour_of_week, starts in top_hours
+        )
+
+        embed = discord.Embed(
+            title=f"When does {streamer_name} usually go live?",
+            description=usual_times,
+            color=10242047,
+            timestamp=datetime.datetime.now()
+        )
+        embed.add_field(name="Streams seen", value=total_starts)
+        if summary["avg_duration"]:
+            embed.add_field(name="Average length",
+                            value=self.format_duration(summary["avg_duration"]))
+        if summary["peak_viewers"]:
+            embed.add_field(
+                name="Viewers",
+                value=f"{summary['avg_viewers']:.0f} avg peak, {summary['peak_viewers']} best")
+        if summary["top_game"]:
+            embed.add_field(name="Most streamed", value=summary["top_game"])
+        if summary["last_started_at"]:
+            embed.add_field(name="Last went live",
+                            value=f"<t:{int(summary['last_started_at'])}:R>")
+        embed.set_footer(text=f"{self.VERSION} | Made by Beelzebub2")
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Schedule(bot, bot.db))
@@ -1,28 +1,24 @@
 from discord.ext import commands
 import discord
 import datetime
-import Functions.others
-from Functions.Sql_handler import SQLiteHandler
 from Functions import Json_config_hanldler
 import os
 import psutil
 
 
 class Stats(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db):
         self.bot = bot
-        self.ch = SQLiteHandler()
+        self.db = db
         self.cwd = os.getcwd()
         self.chj = Json_config_hanldler.JsonConfigHandler(
             os.path.join(self.cwd, "UI\\config.json"))
 
     @commands.command(name="stats", aliases=["st"], help="Shows Bots stats.", usage="stats")
     async def stats(self, ctx):
-        variables = Functions.others.unpickle_variable()
-        working_commands = variables["loaded_commands"]
-        failed_commands = variables["failed_commands"]
-        date_format = variables["date_format"]
-        cached_streamers = variables["streamers_cache"]
+        working_commands = self.bot.state.loaded_commands
+        failed_commands = self.bot.state.failed_commands
+        date_format = self.bot.state.date_format
         app_data_dir = os.getenv('APPDATA')
         db_file = os.path.join(
             app_data_dir, "TwitchDiscordNotifications", "data.db")
@@ -30,7 +26,7 @@ class Stats(commands.Cog):
         formatted_db_size = self.format_size(db_size)
         current_time = datetime.datetime.now()
         start_time = datetime.datetime.strptime(
-            self.ch.get_time(), date_format)
+            await self.db.get_time(), date_format)
         uptime = current_time - start_time
         uptime = str(uptime).split(".")[0]
         self.pid = self.chj.get_pid()
@@ -42,15 +38,71 @@ class Stats(commands.Cog):
         embed = discord.Embed(title="Bot Stats", color=discord.Color.green(
         ), timestamp=datetime.datetime.now())
         embed.add_field(name="Uptime", value=f"{uptime}")
-        embed.add_field(name="Users", value=len(self.ch.get_all_user_ids()))
+        embed.add_field(name="Users", value=len(await self.db.get_all_user_ids()))
         embed.add_field(name="Streamers", value=len(
-            self.ch.get_all_streamers()))
+            await self.db.get_all_streamers()))
         embed.add_field(name="Loaded commands", value=len(working_commands))
         embed.add_field(name="Failed commands", value=len(failed_commands))
         embed.add_field(name="Database Size", value=formatted_db_size)
-        embed.add_field(name="Cached Streamers", value=len(cached_streamers))
+        streamer_cache_stats = self.bot.streamer_cache.get_stats()
+        embed.add_field(
+            name="Cached Streamers",
+            value=f"{streamer_cache_stats['size']}/{streamer_cache_stats['max_entries']} in memory, "
+                  f"{streamer_cache_stats['hits']} hits, {streamer_cache_stats['db_hits']} from disk, "
+                  f"{streamer_cache_stats['fetched']} fetched")
         embed.add_field(name="CPU Usage", value=f"{cpu_percent}%")
         embed.add_field(name="Memory Usage", value=memory_usage)
+        http_stats = self.bot.http_session.get_stats()
+        embed.add_field(
+            name="HTTP Connections",
+            value=f"{http_stats['connections_created']} opened / "
+                  f"{http_stats['connections_reused']} reused "
+                  f"({http_stats['reuse_ratio']:.0%} of {http_stats['requests']} requests)")
+        helix_stats = self.bot.helix.get_stats()
+        embed.add_field(
+            name="Helix Budget",
+            value=f"{helix_stats['tokens']}/{helix_stats['capacity']} left, "
+                  f"{helix_stats['queued']} queued, {helix_stats['rate_limited']} rate limited")
+        if self.bot.eventsub:
+            eventsub_stats = self.bot.eventsub.get_stats()
+            embed.add_field(
+                name="EventSub",
+                value=f"{'Connected' if eventsub_stats['connected'] else 'Disconnected'}, "
+                      f"{eventsub_stats['covered']} streamers covered, "
+                      f"{eventsub_stats['reconnects']} reconnects")
+        db_stats = self.db.get_stats()
+        embed.add_field(
+            name="Database",
+            value=f"{db_stats['connections']} open connections, "
+                  f"{db_stats['reads']} reads on {db_stats['readers']} readers, "
+                  f"{db_stats['writes']} writes "
+                  f"({db_stats['write_time_avg'] * 1000:.1f}ms avg)\n"
+                  f"Schema set up once in {db_stats['schema_time'] * 1000:.1f}ms")
+        backup_stats = self.bot.backups.get_stats()
+        last_backup = backup_stats["last_backup"]
+        embed.add_field(
+            name="Backups",
+            value=f"{backup_stats['kept']} kept, {backup_stats['created']} created, "
+                  f"{backup_stats['skipped']} skipped (unchanged)"
+                  + (f"\nlast {self.format_size(last_backup['size'])} in "
+                     f"{last_backup['copy_time'] + last_backup['compress_time']:.1f}s"
+                     if last_backup else ""))
+        prefix_stats = self.bot.prefixes.get_stats()
+        embed.add_field(
+            name="Prefix Cache",
+            value=f"{prefix_stats['hit_rate']:.1%} hits "
+                  f"({prefix_stats['hits']}/{prefix_stats['hits'] + prefix_stats['misses']}), "
+                  f"{prefix_stats['guilds']} guilds cached")
+        delivery_stats = self.bot.delivery.get_stats()
+        embed.add_field(
+            name="DM Delivery",
+            value=f"{delivery_stats['depth']} queued ({await self.db.count_pending_outbox()} in outbox), "
+                  f"{delivery_stats['sent']} sent, "
+                  f"{delivery_stats['failed']} failed, {delivery_stats['rate_limited']} rate limited\n"
+                  f"wait {delivery_stats['queue_latency_avg']:.2f}s avg / "
+                  f"send {delivery_stats['send_latency_avg'] * 1000:.0f}ms avg")
+        embed.add_field(name="Polling", value=self.bot.poll_scheduler.get_report(),
+                        inline=False)
         await ctx.send(embed=embed)
 
     def format_size(self, size_in_bytes):
@@ -64,4 +116,4 @@ class Stats(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(Stats(bot))
+    await bot.add_cog(Stats(bot, bot.db))
@@ -2,15 +2,13 @@ import datetime
 from discord.ext import commands
 from colorama import Fore
 import discord
-from Functions.Sql_handler import SQLiteHandler
 import Functions.others
 
-ch = SQLiteHandler()
-
 
 class UnRegister(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db):
         self.bot = bot
+        self.db = db
 
     @commands.command(
         name="unregister",
@@ -21,7 +19,8 @@ class UnRegister(commands.Cog):
     async def unregister_user(self, ctx):
         user_id = str(ctx.author.id)
 
-        if ch.delete_user(user_id):
+        if await self.db.delete_user(user_id):
+            self.bot.subscription_index.remove_user(user_id)
 
             Functions.others.log_print(
                 Fore.CYAN
@@ -64,4 +63,4 @@ class UnRegister(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(UnRegister(bot))
+    await bot.add_cog(UnRegister(bot, bot.db))
@@ -2,16 +2,13 @@ import datetime
 from discord.ext import commands
 from colorama import Fore
 import discord
-from Functions.Sql_handler import SQLiteHandler
-import re
 import Functions.others
 
-ch = SQLiteHandler()
-
 
 class UnWatch(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db):
         self.bot = bot
+        self.db = db
 
     @commands.command(
         name="unwatch",
@@ -20,30 +17,25 @@ class UnWatch(commands.Cog):
         help="Removes streamers from your watch list (provide one or more streamer names or links)",
     )
     async def unwatch(self, ctx, *streamer_names_or_links):
-        variables = Functions.others.unpickle_variable()
-        VERSION = variables["version"]
+        VERSION = self.bot.state.version
         removed_streamers = []
         not_in_watchlist = []
 
         user_id = str(ctx.author.id)
-        user_ids = ch.get_all_user_ids()
-
-        for streamer_name_or_link in streamer_names_or_links:
-            if "https://www.twitch.tv/" in streamer_name_or_link:
-                streamer_name = re.search(
-                    r"https://www.twitch.tv/([^\s/]+)", streamer_name_or_link
-                ).group(1)
-                streamer_name = streamer_name.lower()
-            else:
-                streamer_name = streamer_name_or_link.lower()
+        streamer_names = list(dict.fromkeys(
+            Functions.others.parse_streamer_name(streamer_name_or_link)
+            for streamer_name_or_link in streamer_names_or_links
+        ))
 
-            if user_id in user_ids:
-                streamer_list = ch.get_streamers_for_user(user_id)
-                if any(streamer_name.lower() == s.lower() for s in streamer_list):
-                    ch.remove_streamer_from_user(user_id, streamer_name)
-                    removed_streamers.append(streamer_name)
-                else:
-                    not_in_watchlist.append(streamer_name)
+        if user_id in await self.db.get_existing_user_ids([user_id]):
+            removed_streamers = await self.db.remove_streamers_from_user(
+                user_id, streamer_names)
+            for streamer_name in removed_streamers:
+                self.bot.subscription_index.remove(user_id, streamer_name)
+            not_in_watchlist = [
+                streamer_name for streamer_name in streamer_names
+                if streamer_name not in removed_streamers
+            ]
 
         title = description = color = None
         if removed_streamers and not not_in_watchlist:
@@ -80,8 +72,8 @@ class UnWatch(commands.Cog):
             embed.add_field(name="Not in Watchlist",
                             value=f"{not_in_watchlist_str}")
 
-        await ctx.channel.send(embed=embed)
+        await self.bot.delivery.reply(ctx, embed=embed)
 
 
 async def setup(bot):
-    await bot.add_cog(UnWatch(bot))
+    await bot.add_cog(UnWatch(bot, bot.db))
@@ -1,19 +1,15 @@
 import datetime
 from discord.ext import commands
-import aiohttp
 from colorama import Fore
 import discord
-from Functions.Sql_handler import SQLiteHandler
 import Functions.others
-import re
-import asyncio
-
-ch = SQLiteHandler()
+from Functions.rate_limiter import PRIORITY_COMMAND
 
 
 class Watch(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db):
         self.bot = bot
+        self.db = db
         self.COLOR_SUCCESS = 65280
         self.COLOR_WARNING = 16776960
         self.COLOR_ERROR = 16711680
@@ -25,11 +21,7 @@ class Watch(commands.Cog):
         help="Add streamers to your watch list (provide one or more streamer names or links)",
     )
     async def watch(self, ctx, *args):
-        variables = Functions.others.unpickle_variable()
-        self.VERSION = variables["version"]
-        AUTHORIZATION = variables["authorization"]
-        CLIENT_ID = variables["client_id"]
-        self.streamer_data_cache = variables["streamers_cache"]
+        self.VERSION = self.bot.state.version
 
         streamers_data = []
         failed_streamers = set()
@@ -37,49 +29,50 @@ class Watch(commands.Cog):
         not_registered = []
         streamer_names_added = []
 
-        async def process_streamer(session, streamer_name_or_link):
-            if "https://www.twitch.tv/" in streamer_name_or_link:
-                streamer_name = re.search(
-                    r"https://www.twitch.tv/([^\s/]+)", streamer_name_or_link
-                ).group(1)
-                streamer_name = streamer_name.lower()
-            else:
-                streamer_name = streamer_name_or_link.lower()
-
-            if streamer_name in self.streamer_data_cache:
-                pfp = self.streamer_data_cache[streamer_name]["profile_image_url"]
-            else:
-                url = f"https://api.twitch.tv/helix/users?login={streamer_name}"
-                headers = {
-                    "Client-ID": f"{CLIENT_ID}",
-                    "Authorization": f"Bearer {AUTHORIZATION}",
+        streamer_names = list(dict.fromkeys(
+            Functions.others.parse_streamer_name(streamer_name_or_link)
+            for streamer_name_or_link in args
+        ))
+        pfps = {
+            streamer_name: streamer_data["profile_image_url"]
+            for streamer_name, streamer_data in (
+                await self.bot.streamer_cache.get_many(streamer_names, PRIORITY_COMMAND)).items()
+        }
+
+        for streamer_name in streamer_names:
+            if streamer_name not in pfps:
+                Functions.others.log_print(
+                    Fore.CYAN
+                    + Functions.others.get_timestamp()
+                    + Fore.RESET
+                    + Fore.RED
+                    + Functions.others.holders(2)
+                    + f"{Fore.CYAN + streamer_name + Fore.RESET} Twitch profile not found."
+                    + Fore.RESET,
+                    show_message=False
+                )
+                failed_streamers.add(streamer_name)
+        valid_streamers = [name for name in streamer_names if name in pfps]
+
+        user_id = str(ctx.author.id)
+        created_user = False
+        if valid_streamers and user_id not in await self.db.get_existing_user_ids([user_id]):
+            # False when a concurrent watch command created the user first;
+            # the streamers are then added to that watchlist below
+            created_user = await self.db.add_user(
+                user_data={
+                    "discord_username": ctx.author.name,
+                    "discord_id": user_id,
+                    "streamer_list": valid_streamers,
                 }
-                async with session.get(url, headers=headers) as response:
-                    data = await response.json()
+            )
 
-                if not data["data"]:
-                    Functions.others.log_print(
-                        Fore.CYAN
-                        + Functions.others.get_timestamp()
-                        + Fore.RESET
-                        + Fore.RED
-                        + Functions.others.holders(2)
-                        + f"{Fore.CYAN + streamer_name + Fore.RESET} Twitch profile not found."
-                        + Fore.RESET,
-                        show_message=False
-                    )
-                    failed_streamers.add(streamer_name)
-                    return
-                pfp = data["data"][0]["profile_image_url"]
-            user_id = str(ctx.author.id)
-            user_ids = ch.get_all_user_ids()
-            if user_id in user_ids:
-                streamer_list = ch.get_streamers_for_user(user_id)
-                if streamer_name not in streamer_list:
-                    ch.add_streamer_to_user(user_id, streamer_name.strip())
-                    streamer_list.append(streamer_name.strip())
-                    if streamer_name not in streamer_names_added:
-                        streamer_names_added.append(streamer_name)
+        if valid_streamers and not created_user:
+            added = set(await self.db.add_streamers_to_user(user_id, valid_streamers))
+            for streamer_name in valid_streamers:
+                if streamer_name in added:
+                    self.bot.subscription_index.add(user_id, streamer_name)
+                    streamer_names_added.append(streamer_name)
                     Functions.others.log_print(
                         Fore.CYAN
                         + Functions.others.get_timestamp()
@@ -92,7 +85,7 @@ class Watch(commands.Cog):
                     )
                     streamers_data.append({
                         "streamer_name": streamer_name,
-                        "pfp": pfp
+                        "pfp": pfps[streamer_name]
                     })
                 else:
                     Functions.others.log_print(
@@ -104,36 +97,26 @@ class Watch(commands.Cog):
                     )
                     already_in_list.append({
                         "streamer_name": streamer_name,
-                        "pfp": pfp
+                        "pfp": pfps[streamer_name]
                     })
-            else:
-                ch.add_user(
-                    user_data={
-                        "discord_username": ctx.author.name,
-                        "discord_id": user_id,
-                        "streamer_list": [streamer_name.strip()],
-                    }
-                )
+        elif valid_streamers:
+            for streamer_name in valid_streamers:
+                self.bot.subscription_index.add(user_id, streamer_name)
                 streamers_data.append({
                     "streamer_name": streamer_name,
-                    "pfp": pfp
+                    "pfp": pfps[streamer_name]
                 })
-                Functions.others.log_print(
-                    Fore.CYAN
-                    + Functions.others.get_timestamp()
-                    + Fore.RESET                   
-                    + Fore.LIGHTGREEN_EX
-                    + Functions.others.holders(1)
-                    + f"Created a new watchlist for user {Fore.CYAN + ctx.author.name + Fore.RESET}."
-                    + Fore.RESET,
-                    show_message=False
-                )
-                not_registered.append(True)
-
-        async with aiohttp.ClientSession() as session:
-            await asyncio.gather(
-                *[process_streamer(session, streamer) for streamer in args]
+            Functions.others.log_print(
+                Fore.CYAN
+                + Functions.others.get_timestamp()
+                + Fore.RESET
+                + Fore.LIGHTGREEN_EX
+                + Functions.others.holders(1)
+                + f"Created a new watchlist for user {Fore.CYAN + ctx.author.name + Fore.RESET}."
+                + Fore.RESET,
+                show_message=False
             )
+            not_registered.append(True)
 
         streamer_data = [streamer for streamer in streamers_data if streamer]
 
@@ -182,11 +165,8 @@ class Watch(commands.Cog):
             embed.add_field(name="Already in your list",
                             value=f"\n{already_in_list_str}")
 
-        if streamers_data:
-            await ctx.send(embed=embed)
-        else:
-            await ctx.send(embed=embed)
+        await self.bot.delivery.reply(ctx, embed=embed)
 
 
 async def setup(bot):
-    await bot.add_cog(Watch(bot))
+    await bot.add_cog(Watch(bot, bot.db))
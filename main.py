@@ -8,29 +8,50 @@ import os
 import shutil
 import time
 import signal
+import functools
+import json
+import sqlite3
 from discord.ext import commands
 from discord import Intents
 from colorama import Fore
 import dotenv
-import requests
-from Functions.Sql_handler import SQLiteHandler
+from Functions.async_db import AsyncSQLiteHandler
+from Functions.prefix_cache import PrefixCache
+from Functions.backup import BackupManager
+from Functions.streamer_cache import StreamerMetadataCache
+from Functions.stream_sessions import StreamSessionRecorder
+from Functions.bot_state import BotState
+from Functions.http_session import HttpSessionManager
+from Functions.poll_scheduler import PollScheduler
+from Functions.rate_limiter import HelixRateLimiter, PRIORITY_LIVE
+from Functions import eventsub
+from Functions.subscription_index import SubscriptionIndex
+from Functions.notifications import render_live_notification, LiveNotification
+from Functions.delivery import DeliveryQueue, PRIORITY_LIVE_ALERT
 from Functions import Json_config_hanldler
 import Functions.others
 import concurrent.futures
 import Utilities.updater
 import Utilities.custom_decorators
+import Utilities.blocking_guard
 
 
 class TwitchDiscordBot:
     def __init__(self):
         signal.signal(signal.SIGINT, self.custom_interrupt_handler)
+        if Utilities.custom_decorators.chj.get_debug():
+            Utilities.blocking_guard.install()
         self.CLIENT_ID = os.environ.get("client_id")
         self.CLIENT_SECRET = os.environ.get("client_secret")
         self.AUTHORIZATION = os.environ.get("authorization")
         self.TOKEN = os.environ.get("token")
         self.others = Functions.others
         self.cwd = os.getcwd()
-        self.ch = SQLiteHandler()
+        self.db = AsyncSQLiteHandler()
+        # The writer's handler is used directly only during startup, before
+        # the writer thread takes over, and for the temp-file restart helpers
+        self.ch = self.db.writer
+        self.prefixes = PrefixCache(self.db)
         self.chj = Json_config_hanldler.JsonConfigHandler(
             os.path.join(self.cwd, "UI\\config.json")
         )
@@ -44,13 +65,26 @@ class TwitchDiscordBot:
         intents.dm_messages = True
         self.Loaded_commands = []
         self.Failed_commands = []
-        self.streamer_data_cache = {}
+        self.http_session = HttpSessionManager()
         self.bot = commands.Bot(
             command_prefix=commands.when_mentioned_or(self.ch.get_prefix()),
             intents=intents,
             case_insensitive=True,
 
         )
+        self.bot.http_session = self.http_session
+        self.bot.db = self.db
+        self.bot.prefixes = self.prefixes
+        self.backups = BackupManager(
+            self.db.db_file,
+            backup_folder,
+            retention=self.chj.get_backup_retention(),
+            compression=self.chj.get_backup_compression(),
+            incremental=self.chj.get_backup_incremental(),
+        )
+        self.bot.backups = self.backups
+        self.helix = HelixRateLimiter(self.http_session)
+        self.bot.helix = self.helix
         self.temp_dir = tempfile.gettempdir()
         self.heartbeat_file_path = os.path.join(
             self.temp_dir, "TwitchDiscordNotifications\\heartbeat.txt"
@@ -67,58 +101,120 @@ class TwitchDiscordBot:
         else:
             self.processed_streamers = []
         self.API_BASE_URL = "https://api.twitch.tv/helix/streams"
+        self.HELIX_BATCH_SIZE = 100  # max user_login values Helix accepts per request
+        self.poll_scheduler = PollScheduler(
+            budget_per_minute=self.chj.get_poll_budget(),
+            batch_size=self.HELIX_BATCH_SIZE,
+        )
+        self.bot.poll_scheduler = self.poll_scheduler
+        self.sessions = StreamSessionRecorder(self.db)
+        self.bot.sessions = self.sessions
+        self.subscription_index = SubscriptionIndex()
+        self.subscription_index.build_from_pairs(self.ch.iter_subscriptions())
+        self.bot.subscription_index = self.subscription_index
+        self.delivery = DeliveryQueue(
+            workers=self.chj.get_delivery_workers(),
+            on_failure=self.log_delivery_failure,
+        )
+        self.bot.delivery = self.delivery
+        self.OUTBOX_BATCH_SIZE = 500
+        self.outbox_event = asyncio.Event()
+        self.outbox_notifications = {}
+        self.outbox_retry = []
+        self.ch.reset_outbox_in_flight()
+        self.eventsub = None
+        self.bot.eventsub = None
+        self.use_eventsub = self.chj.get_eventsub()
+        self.EVENTSUB_RECONCILE_SECONDS = 300
         self.HEADERS = {
             "Client-ID": self.CLIENT_ID,
             "Authorization": f"Bearer {self.AUTHORIZATION}",
         }
+        self.streamer_cache = StreamerMetadataCache(
+            self.db,
+            self.helix,
+            self.HEADERS,
+            ttl=self.chj.get_streamer_cache_ttl() * 3600,
+            max_entries=self.chj.get_streamer_cache_size(),
+        )
+        self.bot.streamer_cache = self.streamer_cache
         self.date_format = "%Y-%m-%d %H:%M:%S.%f"
-        self.shared_variables = {
-            "console_width": self.console_width,
-            "processed_streamers": self.processed_streamers,
-            "version": self.VERSION,
-            "authorization": self.AUTHORIZATION,
-            "client_id": self.CLIENT_ID,
-            "date_format": self.date_format,
-            "loaded_commands": self.Loaded_commands,
-            "failed_commands": self.Failed_commands,
-            "intents": intents,
-            "headers": self.HEADERS,
-            "streamers_cache": self.streamer_data_cache,
-        }
-        self.others.pickle_variable(self.shared_variables)
-
-    async def check_stream(self, session, streamer_name):
-        if not streamer_name:
-            return False
+        self.state = BotState(
+            version=self.VERSION,
+            console_width=self.console_width,
+            date_format=self.date_format,
+            processed_streamers=self.processed_streamers,
+            loaded_commands=self.Loaded_commands,
+            failed_commands=self.Failed_commands,
+        )
+        self.bot.state = self.state
+        self.others.shared_state = self.state
+        self.state.write_snapshot()
 
-        streamer_name = streamer_name.lower()
+    async def check_streams(self, streamer_names):
+        streamer_names = [
+            name.strip().lower() for name in streamer_names if name and name.strip()
+        ]
+        if not streamer_names:
+            return
 
-        params = {
-            "user_login": streamer_name,
-        }
+        params = [("user_login", name) for name in streamer_names]
+        params.append(("first", str(len(streamer_names))))
 
-        async with session.get(
-            self.API_BASE_URL, headers=self.HEADERS, params=params
-        ) as response:
-            if response.status == 200:
-                data = await response.json()
+        try:
+            status, data = await self.helix.get(
+                self.API_BASE_URL, PRIORITY_LIVE, headers=self.HEADERS, params=params
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.others.log_print(
+                f"{self.others.get_timestamp()}{self.others.holders(2)}Batch request for "
+                f"{len(streamer_names)} streamers failed: {e}",
+                show_message=False,
+            )
+            self.others.log_event(
+                "helix_batch_failed", level="error", message=str(e), streamers=len(streamer_names))
+            return
 
-                if "data" in data and data["data"]:
-                    if streamer_name not in self.processed_streamers:
-                        asyncio.create_task(
-                            self.send_notification(streamer_name.strip(), data)
-                        )
-                        self.processed_streamers.append(streamer_name)
-                    return True
-                if streamer_name in self.processed_streamers:
-                    self.processed_streamers.remove(streamer_name)
-            elif response.status == 401:
-                self.get_twitch_access_token(
-                    self.CLIENT_ID, self.CLIENT_SECRET)
+        if status == 401:
+            await self.get_twitch_access_token(self.CLIENT_ID, self.CLIENT_SECRET)
+            return
+        if status != 200 or not data:
+            # Leave the batch untouched so a failed request does not
+            # flip its streamers offline and re-notify them later
+            self.others.log_print(
+                f"{self.others.get_timestamp()}{self.others.holders(2)}Helix returned "
+                f"{status} for a batch of {len(streamer_names)} streamers",
+                show_message=False,
+            )
+            self.others.log_event(
+                "helix_batch_failed", level="error", status=status, streamers=len(streamer_names))
+            return
 
-            return False
+        live_streams = {
+            stream["user_login"].lower(): stream
+            for stream in data.get("data", [])
+            if stream.get("user_login")
+        }
+        for streamer_name in streamer_names:
+            self.update_stream_status(
+                streamer_name, live_streams.get(streamer_name))
+
+    def update_stream_status(self, streamer_name, stream_data):
+        self.poll_scheduler.record(streamer_name, stream_data)
+        self.sessions.observe(streamer_name, stream_data)
+        if stream_data:
+            if streamer_name not in self.processed_streamers:
+                asyncio.create_task(
+                    self.send_notification(
+                        streamer_name, {"data": [stream_data]})
+                )
+                self.processed_streamers.append(streamer_name)
+            return True
+        if streamer_name in self.processed_streamers:
+            self.processed_streamers.remove(streamer_name)
+        return False
 
-    def get_twitch_access_token(self, client_id, client_secret):
+    async def get_twitch_access_token(self, client_id, client_secret):
         oauth_url = "https://id.twitch.tv/oauth2/token"
 
         params = {
@@ -129,8 +225,8 @@ class TwitchDiscordBot:
         }
 
         try:
-            response = requests.post(oauth_url, params=params)
-            response_data = response.json()
+            async with self.http_session.post(oauth_url, params=params) as response:
+                response_data = await response.json(content_type=None)
 
             if "access_token" in response_data:
                 access_token = response_data["access_token"]
@@ -145,6 +241,7 @@ class TwitchDiscordBot:
                     + f"Authorization token invalid. Generated new authorization token. Restarting Bot{Fore.RESET}"
                 )
 
+                self.others.flush_logs()
                 python = sys.executable
                 os.execl(python, python, *sys.argv)
             else:
@@ -161,127 +258,195 @@ class TwitchDiscordBot:
 
     @Utilities.custom_decorators.performance_tracker
     async def send_notification(self, streamer_name, data):
-        for user_id, streamers in self.ids_with_streamers:
-            try:
-                member = self.bot.get_user(int(user_id))
-                if not member:
-                    continue
-
-                dm_channel = member.dm_channel or await member.create_dm()
-
-                for streamer in streamers:
-                    if streamer_name == streamer.strip():
-                        if "data" not in data or not data["data"]:
-                            self.others.log_print(
-                                f"{self.others.get_timestamp()}{self.others.holders(2)}{streamer_name} is no longer streaming."
-                            )
-                            self.processed_streamers.remove(streamer_name)
-                            continue
-
-                        stream_data = data["data"][0]
-                        started_at = stream_data.get("started_at")
-                        user_id = stream_data.get("user_id")
-
-                        if not started_at or not user_id:
-                            continue
-
-                        user_url = f"https://api.twitch.tv/helix/users?id={user_id}"
-                        user_response = requests.get(
-                            user_url, headers=self.HEADERS)
-                        user_data = user_response.json()
-                        profile_picture_url = user_data["data"][0].get(
-                            "profile_image_url"
-                        )
+        if "data" not in data or not data["data"]:
+            self.others.log_print(
+                f"{self.others.get_timestamp()}{self.others.holders(2)}{streamer_name} is no longer streaming."
+            )
+            if streamer_name in self.processed_streamers:
+                self.processed_streamers.remove(streamer_name)
+            return
 
-                        if profile_picture_url:
-                            profile_picture_url = profile_picture_url.replace(
-                                "{width}", "300"
-                            ).replace("{height}", "300")
+        stream_data = data["data"][0]
+        started_at = stream_data.get("started_at")
+        streamer_id = stream_data.get("user_id")
 
-                        start_time_str = self.others.generate_timestamp_string(
-                            started_at
-                        )
-                        title = stream_data.get("title", "")
-                        viewers = stream_data.get("viewer_count", 0)
-
-                        embed = discord.Embed(
-                            title=f"{streamer_name} is streaming!",
-                            description=f"Click [here](https://www.twitch.tv/{streamer_name}) to watch the stream.",
-                            color=discord.Color.green(),
-                            timestamp=datetime.datetime.now(),
-                        )
+        if not started_at or not streamer_id:
+            return
 
-                        if stream_data.get("game_name"):
-                            embed.add_field(
-                                name="Game", value=stream_data["game_name"])
+        profile_picture_url = await self.get_profile_picture_url(streamer_name)
+        notification = render_live_notification(
+            streamer_name, stream_data, profile_picture_url, self.VERSION)
+
+        stream_id = notification.stream_id
+        self.remember_notification(stream_id, notification)
+        # Recipients are persisted first so a crash or restart mid fan-out
+        # resumes from the outbox instead of losing the remaining DMs
+        recipients = self.subscription_index.get_subscribers(streamer_name)
+        await self.db.enqueue_outbox(
+            stream_id,
+            streamer_name,
+            json.dumps(dict(notification.embed_dict)),
+            recipients,
+        )
+        self.outbox_event.set()
+        started = PollScheduler.parse_started_at(started_at)
+        self.others.log_event(
+            "stream_online",
+            streamer=streamer_name,
+            latency=time.time() - started.timestamp() if started else None,
+            stream_id=stream_id,
+            recipients=len(recipients),
+        )
 
-                        embed.add_field(
-                            name="Viewers",
-                            value="No viewers. Be the first!"
-                            if viewers == 0
-                            else viewers,
-                        )
-                        embed.add_field(name="Title", value=title)
-                        embed.set_thumbnail(url=profile_picture_url)
-                        embed.set_footer(
-                            text=f"{self.VERSION} | Made by Beelzebub2")
-                        mention = f"||{member.mention}||"
-                        embed.add_field(
-                            name="Stream Start Time (local)", value=start_time_str
-                        )
+    def remember_notification(self, stream_id, notification):
+        self.outbox_notifications[stream_id] = notification
+        while len(self.outbox_notifications) > 256:
+            self.outbox_notifications.pop(next(iter(self.outbox_notifications)))
 
-                        max_retry_attempts = 3
-                        for attempt in range(max_retry_attempts):
-                            try:
-                                await dm_channel.send(mention, embed=embed)
-                                self.others.log_print(
-                                    f"{self.others.get_timestamp()}"
-                                    f"{self.others.holders(1)}Notification sent successfully for "
-                                    f"{Fore.CYAN}{streamer_name}. {Fore.LIGHTGREEN_EX}to member "
-                                    f"{Fore.LIGHTCYAN_EX + member.name + Fore.RESET}",
-                                    show_message=False,
-                                )
-                                break
-                            except discord.errors.DiscordServerError:
-                                self.others.log_print(
-                                    f"{self.others.get_timestamp()}"
-                                    f"{self.others.holders(3)}Attempt {attempt + 1} - Discord server error",
-                                    show_message=False)
-                                if attempt == max_retry_attempts - 1:
-                                    self.others.log_print(
-                                        f"{self.others.get_timestamp()}"
-                                        f"{self.others.holders(2)}Max retry attempts reached. Could not send notification.",
-                                        show_message=False)
-                                else:
-                                    await asyncio.sleep(1)
-
-                            except discord.errors.Forbidden:
-                                self.others.log_print(
-                                    f"{self.others.get_timestamp()}"
-                                    f"{self.others.holders(2)}Cannot send a message to user {member.name}. "
-                                    f"Missing permissions or DMs disabled.",
-                                    show_message=False,
-                                )
-            except discord.errors.NotFound:
-                self.others.log_print(
-                    f"{self.others.get_timestamp()}{self.others.holders(2)}User with ID {user_id} not found.",
-                    show_message=False,
+    @Utilities.custom_decorators.performance_tracker
+    async def drain_outbox(self):
+        last_purge = 0
+        while True:
+            rows = await self.db.claim_outbox_batch(self.OUTBOX_BATCH_SIZE)
+            for row_id, stream_id, recipient, attempts, streamer_name, payload in rows:
+                notification = self.outbox_notifications.get(stream_id)
+                if notification is None:
+                    notification = LiveNotification(
+                        streamer_name, stream_id, json.loads(payload))
+                    self.remember_notification(stream_id, notification)
+                await self.delivery.put(
+                    functools.partial(
+                        self.deliver_outbox_row, row_id, notification, recipient),
+                    route=f"dm:{recipient}",
+                    priority=PRIORITY_LIVE_ALERT,
+                    description=f"{streamer_name} notification to {recipient}",
+                    key=row_id,
+                    tags={"streamer": streamer_name, "user": recipient},
                 )
-                continue
+            await self.flush_outbox()
+
+            if time.time() - last_purge > 3600:
+                await self.db.purge_outbox(time.time() - 86400)
+                last_purge = time.time()
+
+            if len(rows) < self.OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self.outbox_event.wait(), 1)
+                except asyncio.TimeoutError:
+                    pass
+                self.outbox_event.clear()
+
+    async def deliver_outbox_row(self, row_id, notification, user_id):
+        # Marked right away: a restart replays every row still in 'sending',
+        # so a batched mark could re-send DMs that were already delivered
+        if await self.deliver_notification(notification, user_id):
+            await self.db.complete_outbox([row_id])
+        else:
+            await self.db.complete_outbox([row_id], status="failed")
+
+    async def flush_outbox(self):
+        if self.outbox_retry:
+            retry, self.outbox_retry = self.outbox_retry, []
+            await self.db.retry_outbox(retry)
+
+    async def deliver_notification(self, notification, user_id):
+        # Discord 5xx and 429 errors propagate so the delivery queue can retry them
+        try:
+            member = self.bot.get_user(int(user_id))
+            if not member:
+                self.others.log_event(
+                    "notification_failed", level="warning", streamer=notification.streamer_name,
+                    user=user_id, reason="user_not_cached")
+                return False
+
+            started = time.perf_counter()
+            dm_channel = member.dm_channel or await member.create_dm()
+            await dm_channel.send(
+                notification.mention_for(member), embed=notification.embed)
+            self.others.log_event(
+                "notification_sent", streamer=notification.streamer_name, user=user_id,
+                latency=time.perf_counter() - started)
+            self.others.log_print(
+                f"{self.others.get_timestamp()}"
+                f"{self.others.holders(1)}Notification sent successfully for "
+                f"{Fore.CYAN}{notification.streamer_name}. {Fore.LIGHTGREEN_EX}to member "
+                f"{Fore.LIGHTCYAN_EX + member.name + Fore.RESET}",
+                show_message=False,
+            )
+            return True
+        except discord.errors.Forbidden:
+            self.others.log_print(
+                f"{self.others.get_timestamp()}"
+                f"{self.others.holders(2)}Cannot send a message to user {user_id}. "
+                f"Missing permissions or DMs disabled.",
+                show_message=False,
+            )
+            self.others.log_event(
+                "notification_failed", level="warning", streamer=notification.streamer_name,
+                user=user_id, reason="dms_closed")
+        except discord.errors.NotFound:
+            self.others.log_print(
+                f"{self.others.get_timestamp()}{self.others.holders(2)}User with ID {user_id} not found.",
+                show_message=False,
+            )
+            self.others.log_event(
+                "notification_failed", level="warning", streamer=notification.streamer_name,
+                user=user_id, reason="user_not_found")
+        return False
+
+    def log_delivery_failure(self, job, error):
+        self.others.log_print(
+            f"{self.others.get_timestamp()}"
+            f"{self.others.holders(2)}Could not deliver {job.description} after "
+            f"{job.attempts} attempts: {error}",
+            show_message=False,
+        )
+        if job.key is None:
+            return  # a command reply, not an outbox row
+        self.outbox_retry.append(job.key)
+        self.others.log_event(
+            "notification_failed", level="error", streamer=job.tags.get("streamer"),
+            user=job.tags.get("user"), reason=str(error), attempts=job.attempts)
+
+    async def get_profile_picture_url(self, streamer_name):
+        try:
+            streamer_data = await self.streamer_cache.get(streamer_name, PRIORITY_LIVE)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+        return self.streamer_cache.profile_picture(streamer_data)
 
     async def on_ready(self):
-        self.ch.save_time(str(datetime.datetime.now()))
+        await self.db.save_time(str(datetime.datetime.now()))
         self.chj.set_time(str(datetime.datetime.now()))
         self.bot.loop.create_task(self.check_for_updates())
         self.bot.loop.create_task(self.cache_streamer_data())
+        self.bot.loop.create_task(self.compact_stream_sessions())
+        self.bot.loop.create_task(self.snapshot_state())
+        self.bot.loop.create_task(self.watch_config())
         self.bot.loop.create_task(self.heart_beat())
         self.bot.loop.create_task(self.create_backup())
+        self.bot.loop.create_task(self.drain_outbox())
+        if self.use_eventsub and self.eventsub is None:
+            self.eventsub = eventsub.EventSubClient(
+                self.http_session,
+                self.helix,
+                self.HEADERS,
+                on_online=self.handle_stream_online,
+                on_offline=self.handle_stream_offline,
+                ws_url=os.environ.get(
+                    "eventsub_ws_url", eventsub.EVENTSUB_WS_URL),
+                subscriptions_url=os.environ.get(
+                    "eventsub_subscriptions_url", eventsub.SUBSCRIPTIONS_URL),
+            )
+            self.bot.eventsub = self.eventsub
+            self.bot.loop.create_task(self.eventsub.run())
+            self.bot.loop.create_task(self.sync_eventsub())
         if not self.ch.check_restart_status():
-            bot_owner_id = self.ch.get_bot_owner_id()
+            bot_owner_id = await self.db.get_bot_owner_id()
             if not bot_owner_id:
                 bot_info = await self.bot.application_info()
                 owner_id = str(bot_info.owner.id)
-                self.ch.save_bot_owner_id(owner_id)
+                await self.db.save_bot_owner_id(owner_id)
                 self.owner = self.bot.get_user(int(owner_id))
             else:
                 self.owner = self.bot.get_user(int(bot_owner_id))
@@ -326,6 +491,11 @@ class TwitchDiscordBot:
 
     @Utilities.custom_decorators.performance_tracker
     async def check_streamers(self):
+        await self.sessions.load()
+        self.poll_scheduler.sync(await self.db.get_all_streamers())
+        for streamer, hour_of_week, starts in await self.db.get_start_hour_counts():
+            self.poll_scheduler.add_start_hours(streamer, hour_of_week, starts)
+
         while True:
             start_time = time.perf_counter()
 
@@ -335,17 +505,23 @@ class TwitchDiscordBot:
                 end="\r",
             )
 
-            streamers = self.ch.get_all_streamers()
-            self.ids_with_streamers = self.ch.get_user_ids_with_streamers().items()
+            streamers = await self.db.get_all_streamers()
+            self.poll_scheduler.sync(streamers)
+            due_streamers = self.poll_scheduler.due()
 
             try:
-                async with aiohttp.ClientSession() as session:
-                    await asyncio.gather(
-                        *[self.check_stream(session, streamer) for streamer in streamers]
-                    )
+                await asyncio.gather(
+                    *[
+                        self.check_streams(batch)
+                        for batch in self.others.chunk_list(
+                            due_streamers, self.HELIX_BATCH_SIZE
+                        )
+                    ]
+                )
 
             except aiohttp.ClientConnectorError:
                 continue
+            await self.sessions.flush()
 
             end_time = time.perf_counter()
             elapsed_time = end_time - start_time
@@ -362,24 +538,49 @@ class TwitchDiscordBot:
             else:
                 print(
                     f"{Fore.CYAN}{self.others.get_timestamp()}{Fore.RESET}{Fore.LIGHTGREEN_EX}{self.others.holders(1)}"
-                    f"Checked {len(streamers)} streamers. Time taken: {elapsed_time:.2f} seconds",
+                    f"Checked {len(due_streamers)}/{len(streamers)} streamers. Time taken: {elapsed_time:.2f} seconds",
                     end="\r",
                 )
 
-            await asyncio.sleep(5)
+            await asyncio.sleep(self.poll_scheduler.cycle_seconds)
+
+    async def handle_stream_online(self, streamer_name):
+        # Helix /streams can lag a few seconds behind the stream.online event
+        for _ in range(3):
+            await self.check_streams([streamer_name])
+            if streamer_name in self.processed_streamers:
+                return
+            await asyncio.sleep(2)
+
+    async def handle_stream_offline(self, streamer_name):
+        self.update_stream_status(streamer_name, None)
+
+    async def sync_eventsub(self):
+        while True:
+            broadcaster_ids = await self.db.get_broadcaster_ids()
+            await self.eventsub.sync(broadcaster_ids.keys())
+            covered = self.eventsub.covered_broadcasters()
+            self.poll_scheduler.set_covered(
+                [broadcaster_ids[broadcaster_id] for broadcaster_id in covered],
+                self.EVENTSUB_RECONCILE_SECONDS,
+            )
+            await asyncio.sleep(30)
 
     @Utilities.custom_decorators.performance_tracker
     async def check_for_updates(self):
         while True:
-            result = Utilities.updater.search_for_updates(self.autoupdate)
+            current_version = await self.db.get_version()
+            result = await asyncio.to_thread(
+                Utilities.updater.search_for_updates, current_version, self.autoupdate)
             if result:
+                await self.db.set_version(result[2])
                 embed = discord.Embed(
                     title="Update Successful",
                     description="Bot Updated successfully.",
                     color=0x00FF00,
                     timestamp=datetime.datetime.now(),
                 )
-                change_log = self.others.get_changelog()
+                change_log = await asyncio.to_thread(self.others.get_changelog)
                 embed.set_thumbnail(url="https://i.imgur.com/TavP95o.png")
                 embed.add_field(name="From", value=result[1])
                 embed.add_field(name="To", value=result[2])
@@ -387,10 +588,10 @@ class TwitchDiscordBot:
                     name="Changelog", value=f"```diff\n{change_log}```", inline=False
                 )
                 await self.owner.send(embed=embed)
-                self.others.pickle_variable(self.shared_variables)
                 data = {"Restarted": True,
                         "Streamers": self.processed_streamers}
                 self.ch.save_to_temp_json(data)
+                self.others.flush_logs()
                 python = sys.executable
                 os.execl(python, python, *sys.argv)
             await asyncio.sleep(600)
@@ -404,59 +605,89 @@ class TwitchDiscordBot:
 
     @Utilities.custom_decorators.performance_tracker
     async def create_backup(self):
-        #TODO  only if backups are enabled
+        if not self.chj.get_backups():
+            return
         while True:
-            os.makedirs(backup_folder, exist_ok=True)
-            self.db_folder = os.path.join(
-                app_data_dir, "TwitchDiscordNotifications")
-            self.default_db_file = os.path.join(self.db_folder, "data.db")
-
-            current_time = time.strftime("%Y-%m-%d_%H-%M-%S")
-            backup_file_name = f"backup_{current_time}.db"
-            backup_file_path = os.path.join(backup_folder, backup_file_name)
-
-            if not os.path.exists(backup_file_path):
-                shutil.copy(self.default_db_file, backup_file_path)
+            try:
+                result = await asyncio.to_thread(self.backups.create_backup)
+            except (sqlite3.Error, OSError) as e:
                 self.others.log_print(
-                    f"{self.others.get_timestamp()}{self.others.holders(1)}Created Backup file! {backup_file_name} saved in {self.db_folder}", show_message=False
+                    f"{self.others.get_timestamp()}{self.others.holders(2)}Backup failed: {e}",
+                    show_message=False,
                 )
+            else:
+                if result:
+                    ok, message = await asyncio.to_thread(
+                        self.backups.verify_backup, result["path"])
+                    if not ok:
+                        self.others.log_print(
+                            f"{self.others.get_timestamp()}{self.others.holders(2)}Backup "
+                            f"{os.path.basename(result['path'])} failed verification: {message}",
+                            show_message=False,
+                        )
+                    else:
+                        self.others.log_print(
+                            f"{self.others.get_timestamp()}{self.others.holders(1)}Created Backup file! "
+                            f"{os.path.basename(result['path'])} saved in {self.backups.backup_folder} "
+                            f"(copy {result['copy_time']:.2f}s, compress {result['compress_time']:.2f}s)",
+                            show_message=False,
+                        )
+            await asyncio.sleep(self.chj.get_backup_interval() * 60)
 
-            backup_files = sorted(os.listdir(backup_folder), reverse=True)
-            if len(backup_files) > 12:
-                files_to_delete = backup_files[12:]
-                for file in files_to_delete:
-                    os.remove(os.path.join(backup_folder, file))
-            await asyncio.sleep(3600)
+    async def compact_stream_sessions(self):
+        while True:
+            cutoff = time.time() - self.chj.get_session_retention() * 86400
+            removed = await self.db.compact_stream_sessions(cutoff)
+            if removed:
+                self.others.log_print(
+                    f"{self.others.get_timestamp()}{self.others.holders(3)}Compacted "
+                    f"{removed} stream sessions older than {self.chj.get_session_retention()} days",
+                    show_message=False,
+                )
+            await asyncio.sleep(6 * 3600)
 
     @Utilities.custom_decorators.performance_tracker
     async def cache_streamer_data(self):
         while True:
-            streamer_list = self.ch.get_all_streamers()
-
-            async with aiohttp.ClientSession() as session:
-                await asyncio.gather(
-                    *[
-                        self.fetch_and_cache_streamer_data(session, streamer)
-                        for streamer in streamer_list
-                    ]
-                )
-            self.others.pickle_variable(self.shared_variables)
+            try:
+                await self.streamer_cache.refresh_expired()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
             await asyncio.sleep(60)
 
-    @Utilities.custom_decorators.performance_tracker
-    async def fetch_and_cache_streamer_data(self, session, streamer_name):
-        streamer_name = streamer_name.replace(" ", "")
-        url = f"https://api.twitch.tv/helix/users?login={streamer_name}"
-
-        if streamer_name in self.streamer_data_cache:
+    async def snapshot_state(self):
+        interval = self.chj.get_state_snapshot_interval()
+        if not interval:
             return
+        last_snapshot = self.state.snapshot()
+        while True:
+            await asyncio.sleep(interval)
+            snapshot = self.state.snapshot()
+            if snapshot != last_snapshot:
+                await asyncio.to_thread(self.state.write_snapshot)
+                last_snapshot = snapshot
+
+    async def watch_config(self):
+        # Only a stat per check; the file is re-parsed when the UI saves it
+        self.chj.on_change(self.apply_config_changes)
+        while True:
+            await asyncio.sleep(2)
+            self.chj.reload()
+
+    def apply_config_changes(self, changed):
+        if "default_prefix" in changed:
+            self.bot.loop.create_task(self.update_default_prefix(changed["default_prefix"]))
+        if "autoupdates" in changed:
+            self.autoupdate = changed["autoupdates"]
+        if "poll_budget" in changed:
+            self.poll_scheduler.budget_per_minute = self.chj.get_poll_budget()
+        self.others.log_print(
+            f"{self.others.get_timestamp()} {Fore.LIGHTCYAN_EX}[CONFIG]{Fore.RESET} Applied changes to "
+            f"{Fore.LIGHTYELLOW_EX}{', '.join(sorted(changed))}{Fore.RESET}", show_message=False)
 
-        async with session.get(url, headers=self.HEADERS) as response:
-            if response.status == 200:
-                data = await response.json()
-                if "data" in data and len(data["data"]) > 0:
-                    streamer_data = data["data"][0]
-                    self.streamer_data_cache[streamer_name] = streamer_data
+    async def update_default_prefix(self, prefix):
+        await self.db.set_prefix(prefix)
+        self.prefixes.default_prefix = prefix
 
     def custom_interrupt_handler(self, signum, frame):
         if len(self.processed_streamers) > 0:
@@ -465,19 +696,22 @@ class TwitchDiscordBot:
             )
             data = {"Restarted": True, "Streamers": self.processed_streamers}
             self.ch.save_to_temp_json(data)
+            self.others.flush_logs()
             os._exit(0)
 
         self.others.log_print(
             f"{self.others.get_timestamp()} {Fore.LIGHTYELLOW_EX}[{Fore.RESET + Fore.LIGHTGREEN_EX}KeyboardInterrupt{Fore.LIGHTYELLOW_EX}]{Fore.RESET}{Fore.LIGHTWHITE_EX} No streamers currently streaming. exiting..."
         )
+        self.others.flush_logs()
         os._exit(0)
 
-    @Utilities.custom_decorators.run_in_thread
     def remove_old_streamers(self, streamers):
+        # Runs on the loop: update_stream_status edits the same list there
         streamers_set = set(map(str.lower, streamers))
         processed_streamers_set = set(map(str.lower, self.processed_streamers))
         items_to_remove = processed_streamers_set - streamers_set
-        self.processed_streamers = [
+        # In place, so bot.state keeps seeing the same list
+        self.processed_streamers[:] = [
             s for s in self.processed_streamers if s.lower() not in items_to_remove
         ]
 
@@ -528,6 +762,7 @@ class TwitchDiscordBot:
             print(
                 f"Secrets missing! Created successfully. Please change filler text in .env on {env_folder} "
             )
+            self.others.flush_logs()
             os._exit(0)
 
     async def load_extension(self, filename):
@@ -587,7 +822,7 @@ class TwitchDiscordBot:
                 self.others.log_print(
                     result, show_message=False, log_file_name="Failed Commands Log.txt")
                 self.Failed_commands.append(filename[:-3])
-        self.others.pickle_variable(self.shared_variables)
+        self.state.write_snapshot()
 
         print(
             f"{self.others.get_timestamp()} {Fore.LIGHTMAGENTA_EX}[PERFORMANCE] Elapsed time: "
@@ -595,15 +830,12 @@ class TwitchDiscordBot:
         )
 
     async def get_custom_prefix(self, bot, message):
-        if message.guild:
-            guild_id = message.guild.id
-            custom_prefix = self.ch.get_guild_prefix(guild_id)
-            if custom_prefix:
-                return custom_prefix
-        return self.ch.get_prefix()
+        return await self.prefixes.resolve(message.guild.id if message.guild else None)
 
     async def load_and_start(self):
         async with self.bot:
+            self.http_session.start()
+            self.delivery.start()
             try:
                 await self.load_extensions()
                 await self.bot.start(self.TOKEN)
@@ -616,7 +848,14 @@ class TwitchDiscordBot:
                     + f"Please grant all the intents to your bot on https://discord.com/developers/applications/{self.bot.user.id}/bot"
                     + Fore.RESET
                 )
+                self.others.flush_logs()
                 os._exit(0)
+            finally:
+                await self.delivery.stop()
+                await self.flush_outbox()
+                await self.http_session.close()
+                self.backups.close()
+                self.db.close()
 
 
 if __name__ == "__main__":